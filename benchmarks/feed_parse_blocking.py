@@ -0,0 +1,106 @@
+"""
+订阅源解析对事件循环的阻塞时间基准
+
+用法: python benchmarks/feed_parse_blocking.py [条目数] [解析次数]
+
+构造一个与 RSSHub 推特路由类似的订阅源（每条带 HTML 正文与图片），分别以
+主线程直接解析（原实现）、线程池、进程池三种方式解析，同时运行一个每 1ms 唤醒一次的
+心跳协程，统计心跳的最大延迟与累计延迟，即事件循环被阻塞的时间。
+"""
+import asyncio
+import importlib.util
+import os
+import sys
+import time
+
+import feedparser
+
+PLUGIN_DIR = os.path.join(os.path.dirname(__file__), "..", "nsy", "plugins", "rssget")
+
+
+def _load(name: str):
+    # 直接按文件加载，避免导入插件包时初始化 NoneBot
+    spec = importlib.util.spec_from_file_location(name, os.path.join(PLUGIN_DIR, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+feed_parse = _load("feed_parse")
+workers = _load("workers")
+
+
+def build_feed(entries: int) -> bytes:
+    items = []
+    for i in range(entries):
+        description = (
+            f"<p>第 {i} 条推文 " + "Lorem ipsum dolor sit amet, <a href='https://x.com/u'>@user</a> " * 20 + "</p>"
+            + "".join(f'<img src="https://pbs.twimg.com/media/{i}_{j}.jpg" referrerpolicy="no-referrer">' for j in range(4))
+            + '<div class="rsshub-quote"><p>' + "quoted text " * 30 + "</p></div>"
+        )
+        items.append(
+            f"<item><title>推文 {i}</title><description><![CDATA[{description}]]></description>"
+            f"<pubDate>Mon, 01 Jan 2024 00:00:00 GMT</pubDate><guid>https://x.com/u/status/{i}</guid>"
+            f"<link>https://x.com/u/status/{i}</link></item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>bench</title>'
+        + "".join(items) + "</channel></rss>"
+    ).encode()
+
+
+async def heartbeat(stop: asyncio.Event, lags: list[float]):
+    interval = 0.001
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(time.perf_counter() - start - interval, 0))
+
+
+async def run_case(name: str, parse, content: bytes, rounds: int):
+    stop = asyncio.Event()
+    lags: list[float] = []
+    beat = asyncio.create_task(heartbeat(stop, lags))
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await parse(content)
+        await asyncio.sleep(0)  # 每次解析之间让出循环，与实际推送流程一致
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    print(
+        f"{name:<8} 总耗时 {elapsed * 1000:8.1f} ms | "
+        f"循环最大阻塞 {max(lags) * 1000:7.2f} ms | 累计阻塞 {sum(lags) * 1000:8.1f} ms"
+    )
+
+
+async def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    content = build_feed(entries)
+    print(f"订阅源大小 {len(content) / 1024:.1f} KiB，{entries} 条，解析 {rounds} 次")
+
+    async def inline(data):
+        feedparser.parse(data)
+
+    thread_pool = workers.WorkerPool("thread", 2, name="bench-thread")
+    process_pool = workers.WorkerPool("process", 2, name="bench-process")
+    await process_pool.start()
+
+    async def threaded(data):
+        feed_parse.to_feed(await thread_pool.run(feed_parse.parse_feed, data))
+
+    async def process(data):
+        feed_parse.to_feed(await process_pool.run(feed_parse.parse_feed, data))
+
+    await run_case("inline", inline, content, rounds)
+    await run_case("thread", threaded, content, rounds)
+    await run_case("process", process, content, rounds)
+    thread_pool.shutdown()
+    process_pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
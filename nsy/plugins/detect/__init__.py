@@ -1,10 +1,12 @@
-import httpx
 from apscheduler.triggers.cron import CronTrigger
 from nonebot import get_bot, get_driver, get_plugin_config, logger, require
 from nonebot.plugin import PluginMetadata
 
 from .config import Config
 
+require("rssget")
+from nsy.plugins.rssget.network import NetworkManager
+
 __plugin_meta__ = PluginMetadata(
     name="detect",
     description="此插件用于检测机器人连接状态",
@@ -27,8 +29,8 @@ async def detect():
 
         if is_online and is_good:
             logger.info("🟢 OneBot 客户端运行良好，Bot 在线。")
-            async with httpx.AsyncClient() as client:
-                await client.get(plugin_config.detect_url, timeout=10)
+            client = NetworkManager.get_client()
+            await client.get(plugin_config.detect_url, timeout=10)
             logger.info("成功发送状态检测请求")
         elif is_online and not is_good:
             logger.warning("🟡 Bot 在线，但客户端状态可能存在异常。")
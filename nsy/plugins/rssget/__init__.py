@@ -1,11 +1,10 @@
 import asyncio
 from datetime import datetime, timedelta
 
-import feedparser
 import httpx
 from apscheduler.triggers.cron import CronTrigger
-from bs4 import BeautifulSoup
-from nonebot import get_bot, get_plugin_config, on_command, require
+from nonebot import get_bot, get_driver, get_plugin_config, on_command, require
+from nonebot.adapters import Bot, Event
 from nonebot.adapters.onebot.v11 import (GROUP_ADMIN, GROUP_OWNER,
                                          GroupMessageEvent, Message,
                                          MessageSegment)
@@ -20,14 +19,24 @@ from sqlalchemy.exc import SQLAlchemyError
 
 from nsy.plugins.rssget.models import User
 
+from . import translation_cache
+from .broadcast import broadcast
 from .config import Config
 from .encrypt import encrypt
+from .feed_cache import validator_store
 from .following_import import fetch_and_match
-from .functions import rss_get
+from .html_extract import extract_html
+from .functions import (delivery_queue, flush_digests, get_cached_feed, host_pool,
+                        parse_pool, replay_outbox, rss_get)
 from .get_id import get_id
+from .media import media_pool, media_store
 from .models import Detail
 from .models_method import (ContentManager, DetailManager, GroupconfigManager,
                             PlantformManager, SubscribeManager, UserManager)
+from .network import NetworkManager
+from .poll_scheduler import PollScheduler
+from .ratelimit import SEND_APIS, SendRateLimiter, send_lane
+from .retry import retry_scheduler
 from .translation import Ali, BaiDu, DeepSeek, Ollama
 from .update_text import get_text, update_text
 
@@ -49,10 +58,52 @@ config = get_plugin_config(Config)
 logger.add("data/log/info_log.txt", level="INFO",rotation="5 MB", retention="10 days")
 logger.add("data/log/error_log.txt", level="ERROR",rotation="5 MB")
 
-TIMEOUT = 30  # 请求超时时间
-MAX_CHAR_PER_NODE = 2000
 
 scheduler = require("nonebot_plugin_apscheduler").scheduler
+driver = get_driver()
+
+send_limiter = SendRateLimiter(
+    group_rate=config.send_group_rate,
+    group_burst=config.send_group_burst,
+    global_rate=config.send_global_rate,
+    global_burst=config.send_global_burst,
+    priority_burst=config.send_priority_burst,
+)
+
+
+@Bot.on_calling_api
+async def _pace_send(bot: Bot, api: str, data: dict):
+    """
+    所有发送消息的接口调用（推送、命令回复等）统一经过限速器
+    命令回复走交互通道，推送发送流程中标记为批量通道，排队时命令回复优先
+    """
+    if api in SEND_APIS:
+        await send_limiter.acquire(data.get("group_id"), send_lane.get())
+
+
+@driver.on_startup
+async def _start_workers():
+    await parse_pool.start()
+
+
+@driver.on_shutdown
+async def _stop_workers():
+    parse_pool.shutdown()
+    media_pool.shutdown()
+    retry_scheduler.shutdown()
+    delivery_queue.shutdown()
+    for task in _broadcast_tasks:
+        task.cancel()
+    await NetworkManager.close()
+
+
+@driver.on_bot_connect
+async def _replay_outbox():
+    """bot 连接（含 NapCat 重启后重连）时重放未完成的推送"""
+    try:
+        await replay_outbox()
+    except Exception as e:
+        logger.opt(exception=False).error(f"重放待发送记录失败: {e}")
 
 async def ignore_group(event: GroupMessageEvent) -> bool:
     """检查是否在忽略的群中"""
@@ -100,17 +151,6 @@ async def User_name_get(id) -> User | None:
         return sheet1
 
 
-async def fetch_feed(url: str) -> dict:
-    """异步获取并解析RSS内容"""
-    try:
-        async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-            resp = await client.get(url)
-            resp.raise_for_status()
-            return feedparser.parse(resp.content)
-    except Exception as e:
-        logger.opt(exception=False).error(f"RSS请求失败: {str(e)}")
-        return {"error": f"获取内容失败: {str(e)}"}
-
 def is_current_time_in_period(start_time_str, end_time_str):
     """
     判断当前时间是否在指定的时间段内
@@ -147,9 +187,11 @@ async def extract_content(entry,if_need_trans) -> dict:
     published = new_dt.strftime("%Y-%m-%d %H:%M")
 
     # 清理文本内容
-    clean_text = BeautifulSoup(entry.description, "html.parser").get_text("\n").strip()
+    extracted = extract_html(getattr(entry, "description", ""))
+    clean_text = extracted.text.strip()
     if if_need_trans == 1:
-        trans_text1 = await B.main(BeautifulSoup(entry.description, "html.parser").get_text("\n"))  #为翻译段落划分
+        # 与推送流程（Format.extract_content）翻译相同的去引用正文，共享翻译缓存
+        trans_text1 = await B.main(extracted.clean_text)
         trans_text = trans_text1.replace("+", "\n")
     else:
         trans_text = None
@@ -165,10 +207,7 @@ async def extract_content(entry,if_need_trans) -> dict:
             if enc.get("type", "").startswith("image/"):
                 images.append(enc.href)
 
-    if hasattr(entry, 'description'):
-        soup = BeautifulSoup(entry.description, 'html.parser')
-        for img in soup.find_all('img', src=True):
-            images.append(img['src'])
+    images.extend(extracted.images)
 
     return {
         "title": entry.title,
@@ -184,16 +223,14 @@ async def send_onebot_image(img_url: str):
     """OneBot 专用图片发送方法"""
     bot = get_bot()
     try:
-        async with httpx.AsyncClient(timeout=20) as client:
-            # 下载图片数据
-            resp = await client.get(img_url)
-            resp.raise_for_status()
+        # 获取图片数据（优先读取本地图片缓存）
+        image = await media_store.get(img_url)
 
-            # 构造图片消息段
-            image_seg = MessageSegment.image(resp.content)
+        # 构造图片消息段
+        image_seg = MessageSegment.image(image)
 
-            # 发送图片
-            await rss_cmd.send(image_seg)
+        # 发送图片
+        await rss_cmd.send(image_seg)
 
     except httpx.HTTPError as e:
         logger.opt(exception=False).error(f"图片下载失败: {str(e)}")
@@ -237,12 +274,11 @@ async def handle_rss(event: GroupMessageEvent,args: Message = CommandArg()):
             plantform_name = await PlantformManager.get_Sign_by_student_id(db_session, plantform)
             url = plantform_name.url
             if_need_trans = int(plantform_name.need_trans)
-            feed_url = f"{config.rsshub_host}{url}{userid}"
             user = await User_name_get(userid)
             username = user.User_Name
 
-            # 获取数据
-            data = await fetch_feed(feed_url)
+            # 获取数据（优先读取定时推送缓存的结果）
+            data = await get_cached_feed(plantform, f"{url}{userid}", min_entries=num + 1)
             if "error" in data:
                 await rss_cmd.finish(data["error"])
 
@@ -278,16 +314,18 @@ async def handle_rss(event: GroupMessageEvent,args: Message = CommandArg()):
                                 content["trans_text"],
                                 f"【翻译由{config.model_name}提供】"
                             ]
-                        # 先发送文字内容
-                        await rss_cmd.send("\n".join(msg))
-                        if if_need_trans == 1:
-                            await rss_cmd.send("\n".join(trans_msg))
-
-                        # 发送图片（单独处理）
-                        if int(content["image_num"]) != 0:
-                            await rss_cmd.send(f"🖼️ 检测到 {int(content['image_num'])} 张图片...")
-                            for index, img_url in enumerate(content["images"], 1):
-                                await send_onebot_image(img_url)
+                        # 发送文字的同时在后台预取图片
+                        with media_store.hold(content["images"]):
+                            # 先发送文字内容
+                            await rss_cmd.send("\n".join(msg))
+                            if if_need_trans == 1:
+                                await rss_cmd.send("\n".join(trans_msg))
+
+                            # 发送图片（单独处理）
+                            if int(content["image_num"]) != 0:
+                                await rss_cmd.send(f"🖼️ 检测到 {int(content['image_num'])} 张图片...")
+                                for index, img_url in enumerate(content["images"], 1):
+                                    await send_onebot_image(img_url)
                     else:   #从RSSHUB获取信息
                         logger.info(f"该 {trueid} 推文不存在")
                         content = await extract_content(latest,if_need_trans)
@@ -310,16 +348,18 @@ async def handle_rss(event: GroupMessageEvent,args: Message = CommandArg()):
                                 content["trans_text"],
                                 f"【翻译由{config.model_name}提供】"
                             ]
-                        # 先发送文字内容
-                        await rss_cmd.send("\n".join(msg))
-                        if if_need_trans == 1:
-                            await rss_cmd.send("\n".join(trans_msg))
-
-                        # 发送图片（单独处理）
-                        if content["images"]:
-                            await rss_cmd.send(f"🖼️ 检测到 {len(content['images'])} 张图片...")
-                            for index, img_url in enumerate(content["images"], 1):
-                                await send_onebot_image(img_url)
+                        # 发送文字的同时在后台预取图片
+                        with media_store.hold(content["images"]):
+                            # 先发送文字内容
+                            await rss_cmd.send("\n".join(msg))
+                            if if_need_trans == 1:
+                                await rss_cmd.send("\n".join(trans_msg))
+
+                            # 发送图片（单独处理）
+                            if content["images"]:
+                                await rss_cmd.send(f"🖼️ 检测到 {len(content['images'])} 张图片...")
+                                for index, img_url in enumerate(content["images"], 1):
+                                    await send_onebot_image(img_url)
             except Exception as e:
                 logger.opt(exception=False).error(f"数据库操作错误: {e}")
 
@@ -938,12 +978,11 @@ async def handle_rss(event: GroupMessageEvent,args: Message = CommandArg()):
             plantform_name = await PlantformManager.get_Sign_by_student_id(db_session, plantform)
             url = plantform_name.url
             if_need_trans = int(plantform_name.need_trans)
-            feed_url = f"{config.rsshub_host}{url}{userid}"
             user = await User_name_get(userid)
             username = user.User_Name
 
-            # 获取数据
-            data = await fetch_feed(feed_url)
+            # 获取数据（优先读取定时推送缓存的结果）
+            data = await get_cached_feed(plantform, f"{url}{userid}")
             if "error" in data:
                 await list_article.finish(data["error"])
 
@@ -992,8 +1031,10 @@ async def group_config_(event: GroupMessageEvent, args: Message = CommandArg()):
         parts = _split_args(command)
         if not parts:
             parts = ["1", "0", "1", "1", "0"]
-        if len(parts) != 5:
-            await group_config.finish("用法: 群组配置 [1/0 1/0 1/0 1/0 1/0]")
+        if len(parts) == 5:
+            parts.append("0")  # 第六位汇总推送可省略
+        if len(parts) != 6:
+            await group_config.finish("用法: 群组配置 [1/0 1/0 1/0 1/0 1/0 (1/0)]")
 
         values = [_parse_int(item) for item in parts]
         if any(item is None or item not in (0, 1) for item in values):
@@ -1004,6 +1045,7 @@ async def group_config_(event: GroupMessageEvent, args: Message = CommandArg()):
         if_need_translate = True if values[2] == 1 else False
         if_need_photo_num_mention = True if values[3] == 1 else False
         if_need_merged_message = True if values[4] == 1 else False
+        if_need_digest = True if values[5] == 1 else False
 
         async with (get_session() as db_session):
             config_msg = await GroupconfigManager.get_Sign_by_group_id(db_session, group_id)
@@ -1016,7 +1058,8 @@ async def group_config_(event: GroupMessageEvent, args: Message = CommandArg()):
                         if_need_self_trans=if_need_self_trans,
                         if_need_translate=if_need_translate,
                         if_need_photo_num_mention=if_need_photo_num_mention,
-                        if_need_merged_message=if_need_merged_message
+                        if_need_merged_message=if_need_merged_message,
+                        if_need_digest=if_need_digest
                     )
                     await group_config.finish(f"创建群组 {group_id} 配置成功")
                 except SQLAlchemyError as e:
@@ -1033,7 +1076,8 @@ async def group_config_(event: GroupMessageEvent, args: Message = CommandArg()):
                         if_need_self_trans=if_need_self_trans,
                         if_need_translate=if_need_translate,
                         if_need_photo_num_mention=if_need_photo_num_mention,
-                        if_need_merged_message=if_need_merged_message
+                        if_need_merged_message=if_need_merged_message,
+                        if_need_digest=if_need_digest
                     )
                     await group_config.finish(f"创建群组 {group_id} 配置成功")
                 except SQLAlchemyError as e:
@@ -1079,33 +1123,99 @@ async def handle_rss(event: GroupMessageEvent):
     except Exception as e:
         logger.error(f"发送合并转发消息失败！错误：{type(e).__name__}: {e}")
 
+_broadcast_tasks: set[asyncio.Task] = set()
+
+
+async def _run_broadcast(bot: Bot, event: Event, group_ids: list[int], msg: str):
+    """后台发送通知，完成后向发起者汇报结果"""
+    try:
+        result = await broadcast(bot, group_ids, msg, concurrency=config.broadcast_concurrency)
+        report = (
+            f"📢 通知发送完毕\n"
+            f"成功: {result.sent} 个群\n"
+            f"失败: {len(result.failed)} 个群\n"
+            f"耗时: {result.elapsed:.1f}s"
+        )
+        if result.failed:
+            report += "\n失败群组：\n" + "\n".join(
+                f"  {group_id}: {error[:30]}" for group_id, error in list(result.failed.items())[:20]
+            )
+            if len(result.failed) > 20:
+                report += f"\n  ……等 {len(result.failed)} 个群"
+        await bot.send(event, report)
+    except Exception as e:
+        logger.opt(exception=False).error(f"发送时发生错误: {e}")
+
+
 send_msg = on_command("/send", aliases={"/发送"}, priority=10, permission=SUPERUSER,rule=ignore_group)
 @send_msg.handle()
-async def handle_rss(args: Message = CommandArg()):
+async def handle_rss(bot: Bot, event: Event, args: Message = CommandArg()):
     """
     向所有订阅群组发送通知
+    在后台按限速并发发送，命令立即返回，发送完毕后汇报结果
     """
     command = args.extract_plain_text().strip()
     msg = str(command.split("*")[0])
+    if not msg:
+        await send_msg.finish("用法: /send [通知内容]")
     async with (get_session() as db_session):
         try:
             all_subscriptions = await SubscribeManager.get_all_subscriptions(db_session)
-            bot = get_bot()
-
-            # 去重
-            group_set = {sub.group for sub in all_subscriptions}
-
-            for group_id in group_set:
-                group = int(group_id)
-                try:
-                    await bot.send_group_msg(group_id=group, message=msg)
-                    logger.info(f"成功发送消息到群 {group_id}")
-                except Exception as e:
-                        logger.opt(exception=False).error(f"发送消息到群 {group_id} 失败: {e}")
         except SQLAlchemyError as e:
             logger.opt(exception=False).error(f"数据库操作错误: {e}")
-        except Exception as e:
-            logger.opt(exception=False).error(f"发送时发生错误: {e}")
+            await send_msg.finish("获取订阅群组失败")
+
+    # 去重
+    group_ids = sorted({int(sub.group) for sub in all_subscriptions})
+    if not group_ids:
+        await send_msg.finish("当前无订阅群组")
+
+    task = asyncio.create_task(_run_broadcast(bot, event, group_ids, msg))
+    _broadcast_tasks.add(task)
+    task.add_done_callback(_broadcast_tasks.discard)
+    await send_msg.finish(f"📢 开始向 {len(group_ids)} 个群发送通知，完成后汇报结果")
+
+rsshub_status = on_command("RSSHub状态", aliases={"rsshub状态"}, priority=10, permission=SUPERUSER, rule=ignore_group)
+@rsshub_status.handle()
+async def rsshub_status_():
+    """
+    查看 RSSHub 地址池健康度、对冲请求与推送发送统计
+    """
+    msg_parts = ["📡 RSSHub 地址状态："]
+    for health in host_pool.hosts.values():
+        latency = f"{health.latency:.2f}s" if health.latency is not None else "无数据"
+        p_latency = health.latency_percentile(config.rsshub_hedge_percentile)
+        p_latency = f"{p_latency:.2f}s" if p_latency is not None else "无数据"
+        msg_parts.append(
+            f"\n{health.host}\n"
+            f"  状态: {health.state}\n"
+            f"  平均延迟: {latency}\n"
+            f"  P{int(config.rsshub_hedge_percentile * 100)}延迟: {p_latency}\n"
+            f"  错误率: {health.error_rate:.0%}"
+        )
+    msg_parts.append(
+        f"\n对冲请求: {'开启' if config.rsshub_hedge else '关闭'}\n"
+        f"  已发出: {host_pool.hedges}\n"
+        f"  对冲胜出: {host_pool.hedge_wins}"
+    )
+    msg_parts.append(
+        f"\n发送队列:\n"
+        f"  已发送: {delivery_queue.delivered}\n"
+        f"  待发送: {delivery_queue.pending}"
+    )
+    msg_parts.append(
+        f"\n后台重试:\n"
+        f"  已重试: {retry_scheduler.retried}\n"
+        f"  已放弃: {retry_scheduler.given_up}\n"
+        f"  等待中: {retry_scheduler.pending}"
+    )
+    msg_parts.append(
+        f"\n翻译缓存: {'开启' if config.translation_cache else '关闭'}\n"
+        f"  命中: {translation_cache.hits}\n"
+        f"  未命中: {translation_cache.misses}"
+    )
+    await rsshub_status.finish("\n".join(msg_parts))
+
 
 signal = on_command("/信号", priority=10, permission=SUPERUSER,rule=ignore_group)
 @signal.handle()
@@ -1158,6 +1268,11 @@ async def refresh_article():
 
                 tasks = [process_user(user, sub_list[user]) for user in sub_list]
                 await asyncio.gather(*tasks)
+                # 手动刷新即完整的一轮，汇总模式的群立即合并发送
+                await flush_digests(force=True)
+                # 等待发送队列清空后再返回，手动刷新的结果即为实际发送结果
+                await delivery_queue.join()
+                validator_store.save()
 
             await rss_get().change_config()
             logger.info(f"config.if_first_time_start：{await rss_get().get_signal()}")
@@ -1216,32 +1331,115 @@ async def cleanup_orphan_subscriptions_():
             logger.opt(exception=True).error(f"清理失效订阅失败: {e}")
 
 
-@scheduler.scheduled_job('interval',minutes=config.refresh_time,misfire_grace_time=60)
-async def auto_update_func():
+poller = PollScheduler(
+    min_interval=config.poll_min_interval * 60,
+    max_interval=config.poll_max_interval * 60,
+    lookback_days=config.poll_lookback_days,
+    factor=config.poll_factor,
+)
+_poll_semaphore = asyncio.Semaphore(config.poll_concurrency)  # 控制rsshub请求并发数
+_poll_tasks: set[asyncio.Task] = set()
+
+
+async def _poll_interval(userid: str) -> float:
+    """根据用户近期发推频率计算下次轮询间隔（秒）"""
+    try:
+        async with get_session() as db_session:
+            user = await UserManager.get_Sign_by_student_id(db_session, userid)
+            if not user:
+                return poller.max_interval
+            post_times = await ContentManager.get_recent_times(db_session, user.User_Name, poller.since())
+        return poller.compute_interval(post_times)
+    except SQLAlchemyError as e:
+        logger.opt(exception=False).error(f"获取 {userid} 发推频率时发生错误: {e}")
+        return config.refresh_time * 60
+
+
+async def poll_user(userid: str, groups: list, group_configs: dict):
+    """处理单个到期用户，完成后按其发推频率重新入队"""
+    try:
+        async with _poll_semaphore:
+            logger.info(f"{datetime.now()} 开始处理对 {userid} 的订阅")
+            await R.handle_rss(userid=userid, group_id_list=groups, group_configs=group_configs)
+    except Exception as e:
+        logger.opt(exception=False).error(f"对于{userid}的订阅时发生错误: {e}")
+    finally:
+        interval = await _poll_interval(userid)
+        poller.reschedule(userid, interval)
+        logger.info(f"{userid} 下次轮询将在 {interval / 60:.1f} 分钟后")
+
+
+async def poll_due_users():
     """
-    定时任务，检查更新并向订阅群组发送推文
+    同步订阅列表并取出已到期的用户，每个用户独立处理，不等待整批完成
     """
-    start_time = datetime.now()
-    logger.info(f"任务开始: {start_time}")
+    async with get_session() as db_session:
+        all_subscriptions = await SubscribeManager.get_all_subscriptions(db_session)
+        sub_list = {}
+        for sub in all_subscriptions:
+            sub_list.setdefault(sub.username, []).append(int(sub.group))
+        poller.sync(set(sub_list))
 
+        due_users = poller.pop_due()
+        if not due_users:
+            return
+        group_configs = await GroupconfigManager.get_all_configs(db_session)
+
+    logger.info(f"本轮到期用户 {len(due_users)} 个")
+    tasks = []
+    for userid in due_users:
+        task = asyncio.create_task(poll_user(userid, sub_list.get(userid, []), group_configs))
+        _poll_tasks.add(task)
+        task.add_done_callback(_poll_tasks.discard)
+        tasks.append(task)
+
+    if config.if_first_time_start:
+        # 首次启动需等待全部用户处理完毕后再开启推送
+        await asyncio.gather(*tasks)
+        await R.change_config()
+        logger.info(f"config.if_first_time_start：{await R.get_signal()}")
+
+
+@scheduler.scheduled_job('interval', seconds=config.poll_tick_seconds, misfire_grace_time=60)
+async def auto_update_func():
+    """
+    定时任务，按自适应轮询队列检查更新并向订阅群组发送推文
+    """
     try:
         # 1. 尝试获取 bot
-        bot = get_bot()
-        if not bot:
-            logger.error("未能获取到有效的 bot 实例")
+        try:
+            get_bot()
+        except ValueError:
+            logger.debug("未能获取到有效的 bot 实例")
             return
 
         # 2. 检查时间段
         if is_current_time_in_period("02:00", "08:00"):
-            logger.info("当前为休息时间，跳过本次任务")
+            logger.debug("当前为休息时间，跳过本次任务")
             return
 
-        # 3. 执行核心刷新任务
-        await refresh_article()
+        # 3. 处理到期用户
+        await poll_due_users()
+        validator_store.save()
+
+        # 4. 重新投递已到重试时间的失败推送
+        await replay_outbox(due_only=True)
+
+        # 5. 汇总周期结束后，合并发送汇总模式的群在该周期内收集到的推文
+        await flush_digests()
 
     except Exception as e:
         logger.exception(f"定时任务运行异常: {e}")
-    finally:
-        # 无论成功还是失败，最后记录耗时
-        end_time = datetime.now()
-        logger.info(f"任务结束，总耗时: {end_time - start_time}")
+
+
+@scheduler.scheduled_job(CronTrigger(minute=17), misfire_grace_time=600)
+async def clean_shared_media():
+    """
+    定时任务，清理共享图片目录中超过保留时间的文件（仅 file 交付方式）
+    """
+    if media_store.shared_dir is None:
+        return
+    try:
+        await media_store.shared_dir.gc(config.media_shared_retention * 3600)
+    except Exception as e:
+        logger.exception(f"共享图片目录清理异常: {e}")
@@ -0,0 +1,62 @@
+import asyncio
+import time
+from typing import NamedTuple
+
+from nonebot.adapters import Bot
+from nonebot.log import logger
+
+from .ratelimit import BULK, send_lane
+from .retry import backoff, policy_for
+
+
+class BroadcastResult(NamedTuple):
+    sent: int  # 发送成功的群数
+    failed: dict[int, str]  # 发送失败的群及最后一次错误
+    elapsed: float  # 总耗时（秒）
+
+
+async def _send_with_retry(bot: Bot, group_id: int, message) -> None:
+    """向单个群发送，按异常类型选择重试策略，重试耗尽后抛出最后一次的异常"""
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            await bot.send_group_msg(group_id=group_id, message=message)
+            return
+        except Exception as e:
+            policy = policy_for(e)
+            if attempt >= policy.max_attempts:
+                raise
+            delay = backoff(policy, attempt)
+            logger.warning(f"通知发送到群 {group_id} 失败，{delay:.1f}s 后进行第 {attempt} 次重试: {e}")
+            await asyncio.sleep(delay)
+
+
+async def broadcast(bot: Bot, group_ids: list[int], message, concurrency: int = 8) -> BroadcastResult:
+    """
+    向多个群发送同一条消息
+    最多 concurrency 个群同时发送，发送节奏由限速器控制（批量通道，不影响命令回复），
+    单个群的暂时性失败按重试策略退避重试，不影响其它群
+    """
+    start = time.monotonic()
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for group_id in group_ids:
+        queue.put_nowait(group_id)
+    sent = 0
+    failed: dict[int, str] = {}
+
+    async def _worker():
+        nonlocal sent
+        send_lane.set(BULK)
+        while not queue.empty():
+            group_id = queue.get_nowait()
+            try:
+                await _send_with_retry(bot, group_id, message)
+                sent += 1
+                logger.info(f"成功发送消息到群 {group_id}")
+            except Exception as e:
+                failed[group_id] = str(e)
+                logger.opt(exception=False).error(f"发送消息到群 {group_id} 失败: {e}")
+
+    await asyncio.gather(*(_worker() for _ in range(max(1, min(concurrency, len(group_ids))))))
+    return BroadcastResult(sent=sent, failed=failed, elapsed=time.monotonic() - start)
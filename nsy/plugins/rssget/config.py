@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class Config(BaseModel):
@@ -10,6 +10,48 @@ class Config(BaseModel):
     # RSSHub 配置
     rsshub_host: str = "https://rsshub.app"
     rsshub_host_back: list[str] | None = None
+    # 是否使用条件请求（ETag / Last-Modified），订阅源未更新时直接跳过
+    rsshub_conditional_get: bool = True
+    # 地址熔断：连续失败次数阈值与冷却时间（秒），冷却期内只放行一次探测请求
+    rsshub_breaker_threshold: int = 3
+    rsshub_breaker_cooldown: int = 300
+    # 对冲请求：主地址超过其近期延迟分位数仍未响应时，同时请求备用地址，取先返回者
+    rsshub_hedge: bool = False
+    rsshub_hedge_percentile: float = 0.9
+    rsshub_hedge_min_delay: float = 1.0  # 对冲等待下限（秒）
+    rsshub_hedge_default_delay: float = 5.0  # 主地址尚无延迟样本时的等待时间（秒）
+    # 已解析订阅源缓存：命令优先读取缓存，避免重复请求 RSSHub
+    feed_cache_ttl: int = 300  # 缓存有效期（秒）
+    feed_cache_max_entries: int = 256
+    feed_cache_max_bytes: int = 32 * 1024 * 1024
+    # 定时推送每次只处理最新的若干条，并据此截断请求与解析
+    feed_entry_window: int = 3
+    rsshub_limit_param: bool = True  # 请求时附带 RSSHub 的 limit 参数
+    feed_streaming_parse: bool = True  # 流式读取，读够条目即停止
+    # 订阅源解析执行池："process" 进程池（默认），"thread" 线程池
+    feed_parse_executor: str = "process"
+    feed_parse_workers: int = 2
+
+    # 图片配置
+    # 本地图片缓存：按地址索引、按内容去重，超出容量时淘汰最久未使用的图片
+    media_cache_enabled: bool = True
+    media_cache_max_bytes: int = 512 * 1024 * 1024
+    # 发送前压缩图片：缩放到最长边并重新编码，减少上传到 OneBot 的数据量
+    media_process: bool = False
+    media_max_edge: int = 2048  # 最长边像素上限，0 表示不缩放
+    media_format: str = "jpeg"  # "jpeg" / "webp"
+    media_quality: int = 85
+    # 图片压缩执行池："thread" 线程池（默认，Pillow 编解码时会释放 GIL），"process" 进程池
+    media_process_executor: str = "thread"
+    media_process_workers: int = 2
+    # 图片预取：推文内容就绪后立即在后台并发获取图片，与文字消息发送重叠
+    media_prefetch_concurrency: int = 4
+    # 图片交付方式："base64" 直接发送图片数据（默认）；
+    # "file" 写入与 NapCat 共享的目录，只发送 file:// 路径，需要两个容器挂载同一个卷
+    media_delivery: str = "base64"
+    media_shared_dir: str = "data/media_shared"  # bot 侧共享目录
+    media_shared_uri_prefix: str | None = None  # NapCat 侧看到的共享目录绝对路径，为空时与 bot 侧相同
+    media_shared_retention: int = 24  # 共享目录中文件保留时间（小时）
 
     # 翻译/AI 配置
     api_key: str | None = None
@@ -19,9 +61,41 @@ class Config(BaseModel):
     # 可用性监控配置
     ut_url: str | None = None
 
-    # 更新时间配置
+    # 更新时间配置（单位：分钟），查询发推频率失败时使用的轮询间隔
     refresh_time: int = 20
 
+    # 自适应轮询配置：按用户近期发推频率决定轮询间隔
+    poll_min_interval: int = 5  # 最短轮询间隔（分钟）
+    poll_max_interval: int = 120  # 最长轮询间隔（分钟），即推送最大延迟
+    poll_lookback_days: int = 7  # 统计发推频率回溯天数
+    poll_factor: float = 0.25  # 轮询间隔 = 平均发推间隔 * poll_factor
+    poll_tick_seconds: int = 30  # 检查到期用户的周期（秒）
+    poll_concurrency: int = 5  # 同时处理的用户数
+
+    # 消息发送限速（令牌桶）：每个群一个桶控制单群节奏，全局一个桶控制账号整体速率，不同群之间并行发送
+    # 速率必须大于 0，否则令牌永远无法补充
+    send_group_rate: float = Field(0.5, gt=0)  # 单群每秒补充的消息数
+    send_group_burst: int = 4  # 单群可连续发送的消息数
+    send_global_rate: float = Field(5.0, gt=0)  # 全局每秒补充的消息数
+    send_global_burst: int = 20
+    # 命令回复优先于推送发送；两者同时排队时命令回复连续优先 N 条后让推送发送一条，避免推送饿死
+    send_priority_burst: int = 5
+    # 发送队列最大长度（待发送的 推文×群 数），满时刷新流程等待
+    delivery_queue_size: int = 500
+    # 待发送记录最多尝试次数（含 bot 重连后的重放），超过后放弃
+    outbox_max_attempts: int = 5
+    # 汇总模式：单条合并转发消息最多包含的节点数，超出后拆分为多条
+    digest_max_nodes: int = 30
+    # 推文消息渲染结果的保留时间（秒），期间发往不同群的同一推文共享渲染结果
+    render_cache_ttl: int = 1800
+    # 汇总周期（分钟）：同一周期内轮询到的推文合并为一条消息，周期结束后的首个定时任务发送
+    digest_interval: int = 20
+    # /send 通知同时发送的群数，发送节奏仍受全局限速控制
+    broadcast_concurrency: int = 8
+    # 翻译结果持久化缓存：相同原文（同一平台、模型、目标语言）只翻译一次
+    translation_cache: bool = True
+    translation_cache_max_entries: int = 20000  # 最多保存的译文条数，超出后淘汰最久未使用的
+
     # 发送和并转发消息时所使用时QQ号
     self_id: int = 10001
 
@@ -62,17 +136,18 @@ class Config(BaseModel):
 ——————
 ⭐ 项目开源地址：
 https://github.com/AhsokaTano26/nsybot"""
-    help_msg_2: str = """群组功能设置 (V3.0.0)
+    help_msg_2: str = """群组功能设置 (V3.1.0)
 ——————
-你可以通过发送 群组配置 加上五个数字，来决定机器人的工作方式。
+你可以通过发送 群组配置 加上五个数字（可再加第六个数字开启汇总推送），来决定机器人的工作方式。
 数字 1 代表开启，数字 0 代表关闭。
-🔢五位数字分别对应：
+🔢前五位数字必填，第六位可选，分别对应：
 
 1.转发推文（博主转发别人推文要发吗？）
 2.自我转发（博主转发自己的内容要发吗？）
 3.中文翻译（需要自动翻译成中文吗？）
 4.图片提示（需要提示共有几张图吗？）
 5.合并发送（多条推文合成合并消息吗？）
+6.汇总推送（可选，每轮更新的所有推文汇总成一条合并消息）
 
 💡懒人专用（直接复制）： 
 •【推荐配置】（开翻译/要合并）： 群组配置 1 0 1 1 1
@@ -80,7 +155,7 @@ https://github.com/AhsokaTano26/nsybot"""
 •【全部开启】： 群组配置 1 1 1 1 1
 
 ⚠️ 注意事项：
-五个数字之间必须有空格。
+五个数字之间必须有空格，第六个数字可省略（默认不汇总）。
 如果你直接发送 群组配置（不带数字），系统会默认按推荐配置运行。
 即：1 0 1 1 0
 ——————"""
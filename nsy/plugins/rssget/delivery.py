@@ -0,0 +1,98 @@
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import NamedTuple
+
+from nonebot.log import logger
+
+
+class DeliveryJob(NamedTuple):
+    group_id: int
+    userid: str
+    tweet_id: str
+    content: dict | None  # 推文内容（Format.extract_content / get_text 的结果）
+    options: dict  # send_text 的其余参数：翻译标记与群组配置
+    digest: tuple["DeliveryJob", ...] = ()  # 汇总模式：本任务合并发送的各条推文
+
+    @property
+    def key(self) -> str:
+        """与 Detail 记录相同的 {推文id}-{群号}"""
+        return f"{self.tweet_id}-{self.group_id}"
+
+    @property
+    def keys(self) -> tuple[str, ...]:
+        """本任务覆盖的所有 Detail 记录"""
+        return tuple(job.key for job in self.digest) if self.digest else (self.key,)
+
+
+class DeliveryQueue:
+    """
+    推送发送队列
+    刷新流程只负责写库并投递发送任务，由每个群各自的工作协程按投递顺序发送，
+    某个群发送缓慢不会阻塞其它群、后续推文与其它用户的抓取；
+    队列总长度有上限，满时投递方等待，形成背压
+    """
+
+    def __init__(self, sender: Callable[[DeliveryJob], Awaitable], maxsize: int = 500):
+        self._sender = sender
+        self._slots = asyncio.Semaphore(maxsize)
+        self._queues: dict[int, deque[DeliveryJob]] = {}
+        self._workers: dict[int, asyncio.Task] = {}
+        self._keys: set[str] = set()  # 已投递未完成的任务
+        self._unfinished = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.delivered = 0
+
+    async def put(self, job: DeliveryJob):
+        """投递发送任务，队列已满时等待空位"""
+        await self._slots.acquire()
+        self._keys.update(job.keys)
+        self._unfinished += 1
+        self._idle.clear()
+        self._queues.setdefault(job.group_id, deque()).append(job)
+        if job.group_id not in self._workers:
+            # 工作协程按需创建，群队列清空后退出
+            task = asyncio.create_task(self._work(job.group_id))
+            self._workers[job.group_id] = task
+
+    async def _work(self, group_id: int):
+        queue = self._queues[group_id]
+        try:
+            while queue:
+                job = queue.popleft()
+                try:
+                    await self._sender(job)
+                    self.delivered += 1
+                except Exception as e:
+                    logger.opt(exception=False).error(f"群 {group_id} 推文 {job.tweet_id} 发送失败: {e}")
+                finally:
+                    self._done(job)
+        finally:
+            del self._workers[group_id]
+            # 被取消时剩余任务不再发送，也需归还名额
+            while queue:
+                self._done(queue.popleft())
+            del self._queues[group_id]
+
+    def _done(self, job: DeliveryJob):
+        self._keys.difference_update(job.keys)
+        self._slots.release()
+        self._unfinished -= 1
+        if self._unfinished == 0:
+            self._idle.set()
+
+    async def join(self):
+        """等待所有已投递的任务发送完毕"""
+        await self._idle.wait()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    @property
+    def pending(self) -> int:
+        return self._unfinished
+
+    def shutdown(self):
+        for task in list(self._workers.values()):
+            task.cancel()
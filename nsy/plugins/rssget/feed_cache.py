@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+
+from nonebot.log import logger
+
+VALIDATOR_FILE = "data/feed_validators.json"
+
+
+def _groups_fingerprint(group_id_list) -> str:
+    """订阅群组集合指纹，群组变化时需要重新全量拉取"""
+    joined = ",".join(sorted(str(group_id) for group_id in group_id_list))
+    return hashlib.md5(joined.encode()).hexdigest()
+
+
+class ValidatorStore:
+    """
+    RSSHub 条件请求校验值存储
+    以 feed_url 为键保存 ETag / Last-Modified，并持久化到本地文件，重启后仍可复用
+    """
+
+    def __init__(self, path: str = VALIDATOR_FILE):
+        self.path = path
+        self._data: dict[str, dict] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._data = json.load(f)
+            logger.info(f"已加载 {len(self._data)} 条订阅源校验值")
+        except (OSError, ValueError) as e:
+            logger.warning(f"订阅源校验值文件读取失败，将重新建立: {e}")
+            self._data = {}
+
+    def headers(self, url: str, group_id_list) -> dict:
+        """
+        获取条件请求头
+        若订阅群组发生变化（新增订阅），则不发送条件请求，保证新群组能收到最近推文
+        """
+        record = self._data.get(url)
+        if not record or record.get("groups") != _groups_fingerprint(group_id_list):
+            return {}
+        headers = {}
+        if record.get("etag"):
+            headers["If-None-Match"] = record["etag"]
+        if record.get("last_modified"):
+            headers["If-Modified-Since"] = record["last_modified"]
+        return headers
+
+    def update(self, url: str, validators: dict | None, group_id_list):
+        """在推文处理完成后记录本次响应的校验值"""
+        if not validators or not (validators.get("etag") or validators.get("last_modified")):
+            self.discard(url)
+            return
+        self._data[url] = {
+            "etag": validators.get("etag"),
+            "last_modified": validators.get("last_modified"),
+            "groups": _groups_fingerprint(group_id_list),
+        }
+        self._dirty = True
+
+    def discard(self, url: str):
+        if self._data.pop(url, None) is not None:
+            self._dirty = True
+
+    def save(self):
+        """写入本地文件（先写临时文件再替换，避免中途崩溃损坏文件）"""
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError as e:
+            logger.error(f"订阅源校验值保存失败: {e}")
+
+
+class SingleFlight:
+    """
+    合并相同键的并发请求
+    同一时间只发出一次请求，其余调用方等待并共享同一结果
+    """
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable]):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        # shield：单个调用方被取消时不影响其他等待者
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+
+class ParsedFeedCache:
+    """
+    已解析订阅源的进程内缓存（LRU + TTL）
+    由定时推送写入，命令直接读取，按条目数与原始字节数双重限制容量
+    """
+
+    def __init__(self, ttl: float, max_entries: int, max_bytes: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[dict, int, float]] = OrderedDict()
+        self._bytes = 0
+
+    def get(self, path: str) -> dict | None:
+        record = self._entries.get(path)
+        if record is None:
+            return None
+        data, size, stored_at = record
+        if time.monotonic() - stored_at > self.ttl:
+            self._remove(path)
+            return None
+        self._entries.move_to_end(path)
+        return data
+
+    def put(self, path: str, data: dict):
+        if not data.get("entries"):
+            return
+        size = int(data.get("size", 0))
+        if size > self.max_bytes:
+            return
+        self._remove(path)
+        self._entries[path] = (data, size, time.monotonic())
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def touch(self, path: str):
+        """订阅源确认未变化（304）时刷新有效期"""
+        record = self._entries.get(path)
+        if record is not None:
+            data, size, _ = record
+            self._entries[path] = (data, size, time.monotonic())
+            self._entries.move_to_end(path)
+
+    def _remove(self, path: str):
+        record = self._entries.pop(path, None)
+        if record is not None:
+            self._bytes -= record[1]
+
+
+validator_store = ValidatorStore()
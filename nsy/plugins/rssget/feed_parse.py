@@ -0,0 +1,54 @@
+"""
+订阅源解析
+
+parse_feed 在工作进程中运行，只返回推送流程需要的精简字段（普通 dict / list / tuple），
+避免把完整的 FeedParserDict 序列化回主进程；to_feed 在主进程中还原为 FeedParserDict，
+保持 entry.title / entry.description / entry.guid / entry.enclosures 等原有访问方式不变。
+
+本模块不依赖插件其它模块，可被工作进程与基准脚本直接导入。
+"""
+import feedparser
+from feedparser import FeedParserDict
+
+ENTRY_FIELDS = ("id", "title", "link", "summary")
+
+
+def _compact_entry(entry) -> dict:
+    compact = {key: entry[key] for key in ENTRY_FIELDS if key in entry}
+    if entry.get("published_parsed"):
+        compact["published_parsed"] = tuple(entry["published_parsed"])
+    if "media_content" in entry:
+        compact["media_content"] = [
+            {"type": media.get("type", ""), "url": media.get("url")}
+            for media in entry["media_content"]
+        ]
+    enclosures = [
+        {"rel": "enclosure", "type": link.get("type", ""), "href": link.get("href")}
+        for link in entry.get("links", [])
+        if link.get("rel") == "enclosure"
+    ]
+    if enclosures:
+        compact["links"] = enclosures
+    return compact
+
+
+def parse_feed(content: bytes) -> dict:
+    """解析订阅源并提取精简字段（可在子进程中执行）"""
+    parsed = feedparser.parse(content)
+    return {
+        "bozo": bool(parsed.get("bozo")),
+        "entries": [_compact_entry(entry) for entry in parsed.entries],
+    }
+
+
+def to_feed(compact: dict) -> FeedParserDict:
+    """将精简字段还原为 FeedParserDict"""
+    entries = []
+    for item in compact["entries"]:
+        entry = FeedParserDict(item)
+        if "links" in item:
+            entry["links"] = [FeedParserDict(link) for link in item["links"]]
+        if "media_content" in item:
+            entry["media_content"] = [FeedParserDict(media) for media in item["media_content"]]
+        entries.append(entry)
+    return FeedParserDict(bozo=compact["bozo"], entries=entries)
@@ -1,11 +1,10 @@
 import os
 from datetime import datetime, timedelta
 
-from bs4 import BeautifulSoup
 from nonebot import get_plugin_config
 
 from .config import Config
-from .trans_msg import if_trans, remove_html_tag_soup
+from .html_extract import extract_html
 from .translation import Ali, BaiDu, DeepSeek, Ollama
 
 config = get_plugin_config(Config)
@@ -61,12 +60,11 @@ class Format:
         dt = datetime(*entry.published_parsed[:6]) + timedelta(hours=8)
         published = dt.strftime("%Y-%m-%d %H:%M")
 
-        # 清理文本内容
-        await if_trans(entry)
-        clean_text_old = await remove_html_tag_soup(entry.description)
-        clean_text = BeautifulSoup(clean_text_old, "html.parser").get_text("\n").strip()
-        if if_need_trans == 1 and clean_text_old and trans:
-            trans_text = BeautifulSoup(clean_text_old, "html.parser").get_text("\n")  # 为翻译段落划分
+        # 清理文本内容（单次解析同时得到去除引用后的正文与图片）
+        extracted = extract_html(getattr(entry, "description", ""))
+        clean_text = extracted.clean_text.strip()
+        if if_need_trans == 1 and clean_text and trans:
+            trans_text = extracted.clean_text  # 为翻译段落划分
             trans_text1 = await trans.main(trans_text)
             trans_text_final = trans_text1.replace("+", "\n")
         else:
@@ -84,10 +82,7 @@ class Format:
                 if enc.get("type", "").startswith("image/"):
                     images.append(enc.href)
 
-        if hasattr(entry, 'description'):
-            soup = BeautifulSoup(entry.description, 'html.parser')
-            for img in soup.find_all('img', src=True):
-                images.append(img['src'])
+        images.extend(extracted.images)
 
         return {
             "title": entry.title or None,
@@ -1,8 +1,9 @@
 import asyncio
+import json
+import re
+import time
 from datetime import datetime
 from typing import List
-import random
-import feedparser
 import httpx
 from nonebot import get_bot, get_plugin_config
 from nonebot.adapters.onebot.v11 import Message, MessageSegment
@@ -10,41 +11,27 @@ from nonebot.log import logger
 from nonebot_plugin_orm import get_session
 
 from .config import Config
+from .delivery import DeliveryJob, DeliveryQueue
+from .feed_cache import ParsedFeedCache, SingleFlight, validator_store
+from .feed_parse import parse_feed, to_feed
 from .format_json import Format
+from .host_pool import HostPool
 from .get_id import get_id
-from .models_method import (ContentManager, DetailManager, PlantformManager,
-                            UserManager)
+from .media import media_store
+from .models_method import (ContentManager, DetailManager, GroupconfigManager,
+                            OutboxManager, PlantformManager, UserManager)
+from .network import NetworkManager
+from .ratelimit import BULK, send_lane
+from .render import RenderCache, RenderedTweet, chunk_groups, split_text
+from .retry import OUTBOX_POLICY, backoff, retry_scheduler
 from .trans_msg import if_self_trans, if_trans
 from .update_text import get_text, update_text
+from .workers import WorkerPool
 
 config = get_plugin_config(Config)
 
-class NetworkManager:
-    _client: httpx.AsyncClient = None
-
-    @classmethod
-    def get_client(cls) -> httpx.AsyncClient:
-        if cls._client is None or cls._client.is_closed:
-            # 配置连接池：保持 20 个长连接，最多允许 50 个并发
-            limits = httpx.Limits(max_connections=50, max_keepalive_connections=20)
-            # 配置超时：连接 10s，读写 30s
-            timeout = httpx.Timeout(30.0, connect=10.0)
-            cls._client = httpx.AsyncClient(
-                limits=limits,
-                timeout=timeout,
-                follow_redirects=True,
-            )
-        return cls._client
-
-    @classmethod
-    async def close(cls):
-        if cls._client:
-            await cls._client.aclose()
-            logger.info("网络连接池已关闭")
-
-
-# 消息发送全局限流（限制为3，防止过快发送导致风控，尤其是图片较多时）
-_msg_semaphore = asyncio.Semaphore(3)
+# 订阅源解析放在执行池中，避免大体积订阅源阻塞事件循环
+parse_pool = WorkerPool(config.feed_parse_executor, config.feed_parse_workers, name="feed-parser")
 
 # 默认群组配置值
 _DEFAULT_GROUP_CONFIG = {
@@ -53,6 +40,7 @@ _DEFAULT_GROUP_CONFIG = {
     "if_need_translate": True,
     "if_need_photo_num_mention": True,
     "if_need_merged_message": True,
+    "if_need_digest": False,
 }
 
 
@@ -65,21 +53,69 @@ def _parse_group_config(group_config) -> dict:
             "if_need_translate": group_config.if_need_translate,
             "if_need_photo_num_mention": group_config.if_need_photo_num_mention,
             "if_need_merged_message": group_config.if_need_merged_message,
+            "if_need_digest": group_config.if_need_digest,
         }
     return _DEFAULT_GROUP_CONFIG
 
 
-async def fetch_feed(url: str) -> dict:
-    """异步获取并解析RSS内容"""
-    client = NetworkManager.get_client()
+def _wanted(gc: dict, if_is_self_trans: bool, if_is_trans: bool) -> bool:
+    """按群组配置判断转发类推文是否需要推送"""
+    return (if_is_self_trans and gc["if_need_self_trans"]) or (if_is_trans and gc["if_need_trans"]) \
+        or (not if_is_self_trans and not if_is_trans)
+
+
+# 条目结束标签及截断后需要补齐的闭合标签（RSS 2.0 / Atom）
+_ENTRY_END = re.compile(rb"</(item|entry)>")
+_FEED_CLOSE = {b"item": b"</channel></rss>", b"entry": b"</feed>"}
+
+
+async def _read_window(resp: httpx.Response, window: int) -> bytes:
+    """
+    流式读取响应体，读到第 window 个条目的结束标签即停止，并补齐闭合标签
+    推文正文位于 CDATA 中，不会出现裸的 </item> / </entry>
+    """
+    buffer = bytearray()
+    found = 0
+    search_from = 0
+    async for chunk in resp.aiter_bytes():
+        buffer += chunk
+        while match := _ENTRY_END.search(buffer, search_from):
+            found += 1
+            search_from = match.end()
+            if found >= window:
+                return bytes(buffer[:match.end()]) + _FEED_CLOSE[match.group(1)]
+        # 结束标签可能被分在两个数据块之间，保留末尾一段重新搜索
+        search_from = max(search_from, len(buffer) - len(b"</entry>"))
+    return bytes(buffer)
+
+
+async def fetch_feed(url: str, headers: dict | None = None, window: int | None = None) -> dict:
+    """
+    异步获取并解析RSS内容
+    headers: 条件请求头（If-None-Match / If-Modified-Since），命中 304 时不解析直接返回
+    window: 只需要前 window 条时流式读取，读够即断开，不再下载和解析剩余条目
+    """
+    client = NetworkManager.get_client("rsshub")
     try:
-        resp = await client.get(url)
-        resp.raise_for_status()
-        parsed = feedparser.parse(resp.content)
+        async with client.stream("GET", url, headers=headers) as resp:
+            if resp.status_code == 304:
+                return {"entries": [], "not_modified": True}
+            resp.raise_for_status()
+            if window and config.feed_streaming_parse:
+                content = await _read_window(resp, window)
+            else:
+                content = await resp.aread()
+        parsed = to_feed(await parse_pool.run(parse_feed, content))
 
         if parsed.bozo:  # feedparser 内部解析错误
             logger.warning(f"RSS 格式异常: {url}")
 
+        parsed["size"] = len(content)
+        parsed["window"] = window
+        parsed["validators"] = {
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+        }
         return parsed
     except httpx.HTTPStatusError as e:
         logger.error(f"HTTP错误 {e.response.status_code}: {url}")
@@ -90,6 +126,183 @@ async def fetch_feed(url: str) -> dict:
     return {"entries": [], "error": "Fetch failed"}
 
 
+host_pool = HostPool(
+    [config.rsshub_host, *(config.rsshub_host_back or [])],
+    threshold=config.rsshub_breaker_threshold,
+    cooldown=config.rsshub_breaker_cooldown,
+)
+
+
+async def _report_status(msg: str, status: str = "up"):
+    """向 uptime-kuma 推送 RSSHub 状态"""
+    if not config.ut_url:
+        return
+    try:
+        await rss_get.report_status(config.ut_url + f"?status={status}&msg={msg}&ping=")
+    except Exception as e:
+        logger.opt(exception=False).error(f"发送状态检查时发生错误: {e}")
+
+
+def _feed_headers(feed_url: str, group_id_list: list | None) -> dict | None:
+    """定时推送时附带条件请求头"""
+    if group_id_list is None or not config.rsshub_conditional_get:
+        return None
+    return validator_store.headers(feed_url, group_id_list)
+
+
+def _feed_url(host: str, path: str, window: int | None) -> str:
+    """拼接订阅地址，只需要前几条时通过 RSSHub 通用参数 limit 限制条目数"""
+    feed_url = f"{host}{path}"
+    if window and config.rsshub_limit_param:
+        feed_url += f"{'&' if '?' in path else '?'}limit={window}"
+    return feed_url
+
+
+async def _timed_fetch(host: str, path: str, group_id_list: list | None,
+                       window: int | None) -> tuple[dict, float]:
+    """请求单个实例并计时"""
+    feed_url = _feed_url(host, path, window)
+    start = time.monotonic()
+    result = await fetch_feed(feed_url, headers=_feed_headers(feed_url, group_id_list), window=window)
+    result["feed_url"] = feed_url
+    return result, time.monotonic() - start
+
+
+async def _settle(platform: str, host: str, path: str, result: dict, latency: float) -> bool:
+    """将请求结果计入地址池健康度，返回结果是否可直接使用"""
+    if "error" in result:
+        if host_pool.record_failure(host, latency):
+            await _report_status(f"{platform}地址{host}已熔断")
+        return False
+    if result.get("not_modified") or result.get("entries"):
+        host_pool.record_success(host, latency, platform)
+        return True
+    # 实例存活但返回空内容，可能是该实例抓取失败，继续尝试其他地址
+    host_pool.record_success(host, latency)
+    logger.warning(f"地址 {host} 返回空内容: {path}")
+    return False
+
+
+async def _fetch_hedged(platform: str, host: str, candidates: list[str], path: str,
+                        group_id_list: list | None, window: int | None) -> tuple[dict, bool]:
+    """
+    对冲请求：主请求超过其近期延迟分位数仍未返回时，向下一个可用实例发出相同请求，
+    取先成功返回的结果并取消另一个
+    """
+    delay = host_pool.hedge_delay(
+        host,
+        config.rsshub_hedge_percentile,
+        config.rsshub_hedge_min_delay,
+        config.rsshub_hedge_default_delay,
+    )
+    start = time.monotonic()
+    tasks = {asyncio.create_task(_timed_fetch(host, path, group_id_list, window)): host}
+    done, _ = await asyncio.wait(tasks, timeout=delay)
+
+    if not done:
+        backup = next((h for h in candidates if host_pool.allow(h)), None)
+        if backup is not None:
+            candidates.remove(backup)
+            host_pool.hedges += 1
+            logger.info(f"{host} 超过 {delay:.1f}s 未响应，向 {backup} 发出对冲请求")
+            tasks[asyncio.create_task(_timed_fetch(backup, path, group_id_list, window))] = backup
+
+    result = {"entries": [], "error": "所有 RSSHub 地址均不可用"}
+    pending = set(tasks)
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task_host = tasks[task]
+            result, latency = task.result()
+            if await _settle(platform, task_host, path, result, latency):
+                for loser in pending:
+                    loser.cancel()
+                    host_pool.record_cancelled(tasks[loser], time.monotonic() - start)
+                if task_host != host:
+                    host_pool.hedge_wins += 1
+                return result, True
+    return result, False
+
+
+async def fetch_from_pool(platform: str, path: str, group_id_list: list | None = None,
+                          window: int | None = None) -> dict:
+    """
+    按地址池健康度依次尝试各 RSSHub 实例，拿到内容即返回
+
+    Args:
+        platform: 平台名，用于记住该平台最近可用的地址
+        path: 订阅路径（平台路由前缀 + 用户ID）
+        group_id_list: 订阅群组列表，传入时启用条件请求（仅定时推送使用）
+        window: 只获取前 window 条，None 表示获取完整订阅源
+
+    Returns:
+        dict: 解析结果，附带实际请求的 feed_url；所有地址均失败时包含 error
+    """
+    data = {"entries": [], "error": "所有 RSSHub 地址均不可用"}
+    candidates = host_pool.candidates(platform)
+    while candidates:
+        host = candidates.pop(0)
+        if not host_pool.allow(host):
+            continue
+
+        if config.rsshub_hedge:
+            result, ok = await _fetch_hedged(platform, host, candidates, path, group_id_list, window)
+        else:
+            result, latency = await _timed_fetch(host, path, group_id_list, window)
+            ok = await _settle(platform, host, path, result, latency)
+
+        if ok:
+            return result
+        if "error" not in result:
+            data = result
+    return data
+
+
+feed_flight = SingleFlight()
+
+
+async def fetch_platform_feed(platform: str, path: str, group_id_list: list | None = None,
+                              window: int | None = None) -> dict:
+    """
+    获取订阅源，同一订阅源的并发请求（命令、定时推送、手动刷新）只发出一次
+
+    条件请求与普通请求的结果不能互相替代（304 不含内容），截断与完整结果也不能，因此一并作为键
+    """
+    groups_key = None if group_id_list is None else tuple(sorted(group_id_list))
+    return await feed_flight.do(
+        (path, groups_key, window),
+        lambda: fetch_from_pool(platform, path, group_id_list, window),
+    )
+
+
+# 推文消息渲染缓存：超过 render_cache_ttl 秒或超出容量（最久未使用）的条目淘汰
+render_cache = RenderCache(ttl=config.render_cache_ttl)
+
+feed_cache = ParsedFeedCache(
+    ttl=config.feed_cache_ttl,
+    max_entries=config.feed_cache_max_entries,
+    max_bytes=config.feed_cache_max_bytes,
+)
+
+
+async def get_cached_feed(platform: str, path: str, min_entries: int | None = None) -> dict:
+    """
+    命令使用：优先读取最近一次定时推送或命令拉取的结果
+
+    Args:
+        min_entries: 至少需要的条目数；None 表示需要完整订阅源。定时推送只缓存前几条，不满足时重新拉取
+    """
+    data = feed_cache.get(path)
+    if data is not None:
+        complete = data.get("window") is None
+        if complete or (min_entries is not None and min_entries <= len(data["entries"])):
+            logger.info(f"命中订阅源缓存: {path}")
+            return data
+    data = await fetch_platform_feed(platform, path)
+    feed_cache.put(path, data)
+    return data
+
+
 class rss_get():
     @staticmethod
     async def report_status(status_url):
@@ -108,31 +321,24 @@ class rss_get():
 
         asyncio.create_task(_do_report())
 
-    async def send_onebot_image(self, img_url: str, group_id: int, retry_count: int = 0):
-        """优化后的图片发送，支持连接池复用和优雅重试"""
-        bot = get_bot()
-        client = NetworkManager.get_client()
-
-        try:
-            resp = await client.get(img_url, timeout=20)
-            resp.raise_for_status()
-
-            await bot.call_api("send_group_msg", **{
+    async def send_onebot_image(self, img_url: str, group_id: int):
+        """
+        图片发送，图片数据由各群共享，同一张图片每个周期只下载一次
+        失败时交给重试调度器在后台按退避时间重试，不阻塞后续群的发送
+        """
+        async def _send():
+            image = await media_store.get(img_url)
+            await get_bot().call_api("send_group_msg", **{
                 "group_id": group_id,
-                "message": MessageSegment.image(resp.content)
+                "message": MessageSegment.image(image)
             })
             logger.info(f"图片发送成功")
 
-        except (httpx.HTTPError, Exception) as e:
-            if retry_count < 3:
-                wait_time = (retry_count + 1) * 2  # 2s, 4s, 6s
-                logger.warning(f"图片下载失败，{wait_time}s 后进行第 {retry_count + 1} 次重试: {e}")
-                await asyncio.sleep(wait_time)
-                await self.send_onebot_image(img_url, group_id, retry_count + 1)
-            else:
-                logger.error(f"图片发送达到最大重试次数: {img_url}")
-                # 只有最后一次失败才打扰用户
-                await bot.send_group_msg(group_id=group_id, message=f"❌ 图片下载失败: {str(e)[:30]}")
+        async def _give_up(e: BaseException):
+            # 只有最后一次失败才打扰用户
+            await get_bot().send_group_msg(group_id=group_id, message=f"❌ 图片下载失败: {str(e)[:30]}")
+
+        await retry_scheduler.run(f"群 {group_id} 图片 {img_url}", _send, on_give_up=_give_up)
 
     async def send_text(self,
                         group_id: int,
@@ -152,62 +358,68 @@ class rss_get():
 
         # 使用预加载配置
         gc = _parse_group_config(group_config)
-        if_need_user_trans = gc["if_need_trans"]
-        if_need_self_trans = gc["if_need_self_trans"]
         if_need_translate = gc["if_need_translate"]
         if_need_photo_num_mention = gc["if_need_photo_num_mention"]
         if_need_merged_message = gc["if_need_merged_message"]
 
-        if (if_is_self_trans and if_need_self_trans) or (if_is_trans and if_need_user_trans) or (not if_is_self_trans and not if_is_trans):
-            # 构建文字消息
-            msg = [
-                f"🐦 用户 {content['username']} 最新动态\n"
-                f"⏰ {content['time']}\n"
-                f"🔗 {content['link']}"
-                "\n📝 正文："
-                f"{content['text']}"
-            ]
-
-            trans_msg = [
-                f"{content['trans_text']}"
-                f"\n【翻译由{config.model_name}提供】"
-            ]
+        if _wanted(gc, if_is_self_trans, if_is_trans):
+            # 只有这三项影响消息内容，同一推文相同组合的群共享渲染结果
+            show_trans = if_need_trans and if_need_translate
+            rendered = render_cache.get_or_build(
+                (content["id"], if_need_merged_message, show_trans, if_need_photo_num_mention),
+                lambda: self.render(content, if_need_merged_message, show_trans, if_need_photo_num_mention),
+            )
 
-            if if_need_merged_message:
-                async with _msg_semaphore:
-                    await self.handle_merge_send(group_id=group_id, msg=msg, trans_msg=trans_msg, content=content)
+            # 发送节奏由 on_calling_api 钩子中的限速器按群控制
+            if rendered.merged:
+                await self.handle_merge_send(group_id=group_id, forward_message=rendered.messages[0])
             else:
-                async with _msg_semaphore:
+                for message in rendered.messages:
                     await bot.call_api("send_group_msg", **{
                         "group_id": group_id,
-                        "message": "\n".join(msg)
+                        "message": message
                     })
 
-                if if_need_trans and if_need_translate:
-                    async with _msg_semaphore:
-                        await bot.call_api("send_group_msg", **{
-                            "group_id": group_id,
-                            "message": "\n".join(trans_msg)
-                        })
-
                 logger.info("成功发送文字信息")
 
                 # 发送图片（单独处理）
-                if content["images"]:
-                    if if_need_photo_num_mention:
-                        async with _msg_semaphore:
-                            await bot.call_api("send_group_msg", **{
-                                "group_id": group_id,
-                                "message": f"🖼️ 检测到 {len(content['images'])} 张图片..."
-                            })
-                        for index, img_url in enumerate(content["images"], 1):
-                            await self.send_onebot_image(img_url, group_id)
+                for img_url in rendered.images:
+                    await self.send_onebot_image(img_url, group_id)
 
                 logger.info("成功发送图片信息")
 
+    @classmethod
+    def render(cls, content: dict, merged: bool, show_trans: bool, photo_num_mention: bool) -> RenderedTweet:
+        """按群组配置构建推文消息（不含发送）"""
+        # 构建文字消息
+        msg = [
+            f"🐦 用户 {content['username']} 最新动态\n"
+            f"⏰ {content['time']}\n"
+            f"🔗 {content['link']}"
+            "\n📝 正文："
+            f"{content['text']}"
+        ]
+
+        trans_msg = [
+            f"{content['trans_text']}"
+            f"\n【翻译由{config.model_name}提供】"
+        ]
+
+        if merged:
+            forward_message = cls.build_merge_message(msg=msg, trans_msg=trans_msg, content=content)
+            return RenderedTweet(messages=(forward_message,), images=(), merged=True)
+
+        messages = ["\n".join(msg)]
+        if show_trans:
+            messages.append("\n".join(trans_msg))
+        images = ()
+        if content["images"] and photo_num_mention:
+            messages.append(f"🖼️ 检测到 {len(content['images'])} 张图片...")
+            images = tuple(content["images"])
+        return RenderedTweet(messages=tuple(messages), images=images, merged=False)
+
     @staticmethod
-    async def handle_merge_send(group_id, msg, trans_msg, content):
-        bot = get_bot()
+    def build_merge_message(msg, trans_msg, content) -> Message:
         # --- 1. 准备节点内容 ---
 
         forward_nodes = []
@@ -249,18 +461,135 @@ class rss_get():
             )
             forward_nodes.append(node3)
 
-
-        # --- 3. 打包发送 ---
+        # --- 2. 打包 ---
         # 将节点列表转换为一个包含所有转发节点的 Message 对象
-        forward_message = Message(forward_nodes)
+        return Message(forward_nodes)
+
+    @classmethod
+    def render_digest(cls, content: dict, show_trans: bool) -> RenderedTweet:
+        """构建汇总消息中单条推文的节点：正文（超长拆分）、翻译、图片"""
+        text = (
+            f"🐦 用户 {content['username']} 最新动态\n"
+            f"⏰ {content['time']}\n"
+            f"🔗 {content['link']}"
+            "\n📝 正文："
+            f"{content['text']}"
+        )
+        parts = split_text(text)
+        if show_trans and content.get("trans_text"):
+            parts += split_text(f"{content['trans_text']}\n【翻译由{config.model_name}提供】")
+        nodes = [cls._node(part) for part in parts]
+        if content["images"]:
+            nodes.append(cls._node(Message([MessageSegment.image(img_url) for img_url in content["images"]])))
+        return RenderedTweet(messages=tuple(nodes), images=(), merged=True)
+
+    @staticmethod
+    def _node(content) -> MessageSegment:
+        return MessageSegment.node_custom(
+            user_id=config.self_id,
+            nickname="Ksm 初号机",
+            content=content,
+        )
 
+    @staticmethod
+    async def handle_merge_send(group_id, forward_message: Message):
+        bot = get_bot()
         try:
             # 发送合并打包消息
             await bot.send_group_msg(group_id=group_id, message=forward_message)
             logger.info(f"发送群 {group_id} 合并转发消息成功")
         except Exception as e:
             logger.error(f"发送群 {group_id} 合并转发消息失败: {e}")
+            # 交由发送队列记录失败，待发送记录保留以便重放
+            raise
 
+    async def deliver(self, job: DeliveryJob):
+        """
+        发送队列的工作协程调用：向单个群发送推文，结束后释放该群持有的图片引用
+        发送成功后写入 Detail 并删除待发送记录；失败时保留记录，在 bot 重新连接时重放，
+        超过 outbox_max_attempts 次仍失败则放弃，写入 Detail 避免反复重发
+        """
+        # 推送走批量通道，命令回复优先发送；图片重试任务继承该标记
+        send_lane.set(BULK)
+        if job.digest:
+            await self.deliver_digest(job)
+            return
+        try:
+            await self.send_text(group_id=job.group_id, content=job.content, **job.options)
+        except Exception as e:
+            logger.opt(exception=False).error(
+                f"处理 {job.group_id} 对 {job.userid} 的推文 {job.tweet_id} 时发生错误: {e}")
+            await _record_delivery_failure(job.key, job.content["text"])
+        else:
+            async with get_session() as db_session:
+                await OutboxManager.complete(db_session, job.key, job.content["text"], datetime.now())
+            logger.info(f"创建数据: {job.key}")
+        finally:
+            media_store.release(job.content["images"] or ())
+
+    async def deliver_digest(self, job: DeliveryJob):
+        """
+        汇总模式：把本周期发往该群的所有推文装入合并转发消息发送
+        每条消息不超过 digest_max_nodes 个节点，同一推文的节点不拆开；
+        某条消息发送失败时，其中及之后的推文记为失败，已发出的推文正常写入 Detail
+        """
+        members = []
+        skipped = []
+        for member in job.digest:
+            options = member.options
+            gc = _parse_group_config(options.get("group_config"))
+            if _wanted(gc, options["if_is_self_trans"], options["if_is_trans"]):
+                members.append(member)
+            else:
+                skipped.append(member)
+
+        sent = list(skipped)
+        failed = []
+        try:
+            groups = []
+            for member in members:
+                content = member.content
+                gc = _parse_group_config(member.options.get("group_config"))
+                show_trans = member.options["if_need_trans"] == 1 and gc["if_need_translate"]
+                rendered = render_cache.get_or_build(
+                    (content["id"], "digest", show_trans),
+                    lambda: self.render_digest(content, show_trans),
+                )
+                groups.append((member, list(rendered.messages)))
+
+            # 预留一个节点给每条消息的标题
+            chunks = chunk_groups([nodes for _, nodes in groups], max(2, config.digest_max_nodes) - 1)
+            index = 0
+            for number, chunk in enumerate(chunks, 1):
+                chunk_members = [member for member, _ in groups[index:index + len(chunk)]]
+                index += len(chunk)
+                if failed:
+                    failed += chunk_members
+                    continue
+                title = f"📰 本轮共 {len(members)} 条新推文"
+                if len(chunks) > 1:
+                    title += f"（{number}/{len(chunks)}）"
+                nodes = [self._node(title)] + [node for nodes in chunk for node in nodes]
+                try:
+                    await self.handle_merge_send(group_id=job.group_id, forward_message=Message(nodes))
+                    sent += chunk_members
+                except Exception as e:
+                    logger.opt(exception=False).error(f"群 {job.group_id} 汇总消息发送失败: {e}")
+                    failed += chunk_members
+        except Exception as e:
+            logger.opt(exception=False).error(f"构建群 {job.group_id} 汇总消息时发生错误: {e}")
+            failed += [member for member in members if member not in sent and member not in failed]
+        finally:
+            try:
+                async with get_session() as db_session:
+                    for member in sent:
+                        await OutboxManager.complete(db_session, member.key, member.content["text"], datetime.now())
+                for member in failed:
+                    await _record_delivery_failure(member.key, member.content["text"])
+                logger.info(f"群 {job.group_id} 汇总发送 {len(sent)} 条，失败 {len(failed)} 条")
+            finally:
+                for member in job.digest:
+                    media_store.release(member.content["images"] or ())
 
     async def handle_rss(self, userid: str, group_id_list: list, group_configs: dict = None):
         """
@@ -277,56 +606,31 @@ class rss_get():
             platform = await PlantformManager.get_Sign_by_student_id(db_session, user.Plantform)
             url = platform.url
             if_need_trans = int(platform.need_trans)
-            feed_url = f"{config.rsshub_host}{url}{userid}"
-            # 获取数据
-            data = await fetch_feed(feed_url)
+            # 按地址池健康度选择 RSSHub 实例获取数据（带条件请求头，订阅源未变化时返回 304）
+            path = f"{url}{userid}"
+            window = config.feed_entry_window
+            data = await fetch_platform_feed(platform.name, path, group_id_list, window)
+
+            if data.get("not_modified"):
+                logger.info(f"{userid} 的订阅源未更新，跳过本次处理")
+                feed_cache.touch(path)
+                return
 
             if "error" in data:
-                logger.opt(exception=False).error(data["error"])
+                logger.opt(exception=False).error(f"{platform.name} {data['error']}")
+                await _report_status(f"{platform.name}所有地址均失效")
                 return
 
-            # RssHub可用性检查
             if not data.get("entries"):
-                logger.error("该用户暂无动态或不存在,尝试使用备用地址")
-                try:
-                    URL = config.ut_url + f"?status=up&msg={platform.name}可能暂时不可用,尝试使用备用地址&ping="
-                    await self.report_status(URL)
-                except Exception as e:
-                    logger.opt(exception=False).error(f"发送状态检查时发生错误: {e}")
-
-                if config.rsshub_host_back is not None:
-                    for rsshub_url in config.rsshub_host_back:
-                        feed_url_back = f"{rsshub_url}{url}{userid}"
-                        data = await fetch_feed(feed_url_back)
-                        if not data.get("entries"):
-                            logger.error(f"备用地址 {rsshub_url}该用户暂无动态或不存在")
-                            try:
-                                URL = config.ut_url + f"?status=up&msg={platform.name}备用地址{rsshub_url}可能暂时不可用&ping="
-                                await self.report_status(URL)
-                            except Exception as e:
-                                logger.opt(exception=False).error(f"发送状态检查时发生错误: {e}")
-                            continue
-                        logger.success(f"成功从备用地址获取数据: {rsshub_url}")
-                    if not data.get("entries"):
-                        logger.error("所有备用地址均不可用或暂无动态")
-                        try:
-                            URL = config.ut_url + f"?status=up&msg={platform.name}所有备用地址均失效&ping="
-                            await self.report_status(URL)
-                        except Exception as e:
-                            logger.opt(exception=False).error(f"发送状态检查时发生错误: {e}")
-                        return None
-                else:
-                    return
+                logger.error(f"{userid} 暂无动态或不存在")
+                return
 
-            try:
-                URL = config.ut_url + f"?status=down&msg={platform.name}已恢复正常&ping="
-                await self.report_status(URL)
-            except Exception as e:
-                logger.opt(exception=False).error(f"发送状态检查时发生错误: {e}")
+            await _report_status(f"{platform.name}已恢复正常", status="down")
+            feed_cache.put(path, data)
 
             # 收集所有 entry 的 ID
             entries_info = []
-            entry_count = min(3, len(data.entries))
+            entry_count = min(window, len(data.entries))
             for data_number in range(entry_count):
                 latest = data.entries[data_number]
                 trueid = await get_id(latest)
@@ -338,75 +642,257 @@ class rss_get():
                 for group_id in group_id_list:
                     all_detail_ids.append(f"{trueid}-{group_id}")
             existing_detail_ids = await DetailManager.get_existing_ids(db_session, all_detail_ids)
+            # 已在待发送记录中的推文由重放流程负责，不重复投递
+            existing_detail_ids |= await OutboxManager.get_existing_ids(db_session, all_detail_ids)
 
-            # 逐条处理 entry
-            for latest, trueid in entries_info:
-                logger.info(f"正在处理 {userid} | {username} 的推文 {trueid}")
-
-                if_is_self_trans = await if_self_trans(username, latest)
-                if_is_trans = await if_trans(latest)
-
-                # 只加载一次
-                content = None
-                content_loaded = False
-
-                # 检查 Content 缓存
-                existing_content = await ContentManager.get_Sign_by_student_id(db_session, trueid)
+            # 有推文未能写入或投递时不记录校验值，保证下次轮询重新全量拉取并重试
+            had_failure = False
+            try:
+                # 逐条处理 entry
+                for latest, trueid in entries_info:
+                    # 尚未发送该推文的群，图片按此计数共享，最后一个群发送完毕后释放
+                    pending_groups = [
+                        group_id for group_id in group_id_list if f"{trueid}-{group_id}" not in existing_detail_ids
+                    ]
+                    remaining = len(pending_groups)
+                    # 合并转发与汇总直接使用图片地址，只有存在逐条发送的群时才需要预取图片
+                    need_prefetch = False
+                    if not config.if_first_time_start:
+                        for group_id in pending_groups:
+                            gc = _parse_group_config(group_configs.get(group_id) if group_configs else None)
+                            if not gc["if_need_merged_message"] and not gc["if_need_digest"]:
+                                need_prefetch = True
+                                break
+                    logger.info(f"正在处理 {userid} | {username} 的推文 {trueid}")
+
+                    if_is_self_trans = await if_self_trans(username, latest)
+                    if_is_trans = await if_trans(latest)
+
+                    # 只加载一次
+                    content = None
+                    content_loaded = False
+
+                    # 检查 Content 缓存
+                    existing_content = await ContentManager.get_Sign_by_student_id(db_session, trueid)
+
+                    # 数据库写入按群顺序进行，发送任务交给发送队列由各群的工作协程执行
+                    for group_id in group_id_list:
+                        id_with_group = f"{trueid}-{group_id}"
+                        if id_with_group in existing_detail_ids:
+                            logger.info(f"{id_with_group} 已发送")
+                            continue
 
-                for group_id in group_id_list:
-                    id_with_group = f"{trueid}-{group_id}"
-                    if id_with_group in existing_detail_ids:
-                        logger.info(f"{id_with_group} 已发送")
-                        continue
-
-                    try:
-                        # 按需加载
-                        if not content_loaded:
-                            if existing_content:
-                                logger.info(f"该 {trueid} 推文本地已存在")
-                                content = await get_text(trueid)
+                        handed_off = False
+                        try:
+                            # 按需加载
+                            if not content_loaded:
+                                if existing_content:
+                                    logger.info(f"该 {trueid} 推文本地已存在")
+                                    content = await get_text(trueid)
+                                else:
+                                    logger.info(f"该 {trueid} 推文本地不存在")
+                                    content = await Format().extract_content(latest, if_need_trans)
+                                    content["username"] = username
+                                    content["id"] = trueid
+                                    await update_text(content)
+                                content_loaded = True
+                                media_store.retain(content["images"] or (), remaining)
+                                if need_prefetch:
+                                    # 图片在后台并发获取，与后续文字消息的发送重叠
+                                    media_store.prefetch(content["images"])
+
+                            if config.if_first_time_start:
+                                # 写入 Detail 记录
+                                await DetailManager.create_signmsg(
+                                    db_session,
+                                    id=id_with_group,
+                                    summary=content['text'],
+                                    updated=datetime.now(),
+                                )
+                                logger.info(f"创建数据: {content.get('id')}")
+                                logger.info("第一次启动，跳过发送")
                             else:
-                                logger.info(f"该 {trueid} 推文本地不存在")
-                                content = await Format().extract_content(latest, if_need_trans)
-                                content["username"] = username
-                                content["id"] = trueid
-                                await update_text(content)
-                            content_loaded = True
-
-                        # 写入 Detail 记录
-                        await DetailManager.create_signmsg(
-                            db_session,
-                            id=id_with_group,
-                            summary=content['text'],
-                            updated=datetime.now(),
-                        )
-                        logger.info(f"创建数据: {content.get('id')}")
-
-                        if config.if_first_time_start:
-                            logger.info("第一次启动，跳过发送")
-                        else:
-                            # 使用预加载的群组配置
-                            gc = group_configs.get(group_id) if group_configs else None
-                            await self.send_text(
-                                group_id=group_id,
-                                content=content,
-                                if_need_trans=if_need_trans,
-                                if_is_self_trans=if_is_self_trans,
-                                if_is_trans=if_is_trans,
-                                group_config=gc,
-                            )
-                            # 发送完一条推文后随机等待1.5-3.5秒，避免过快发送导致风控
-                            delay = random.uniform(1.5, 3.5)
-                            await asyncio.sleep(delay)
-
-                    except Exception as e:
-                        logger.opt(exception=False).error(
-                            f"处理 {group_id} 对 {userid} 的推文 {trueid} 时发生错误: {e}")
-
-                    await asyncio.sleep(0.1)
+                                options = {
+                                    "if_need_trans": if_need_trans,
+                                    "if_is_self_trans": if_is_self_trans,
+                                    "if_is_trans": if_is_trans,
+                                }
+                                # 先写入待发送记录，发送成功后再写入 Detail，中途崩溃或断线可重放；
+                                # 投递完成前标记为处理中，避免重放流程重复投递
+                                _inflight.add(id_with_group)
+                                await OutboxManager.create_signmsg(
+                                    db_session,
+                                    id=id_with_group,
+                                    tweet_id=trueid,
+                                    userid=userid,
+                                    group_id=group_id,
+                                    options=json.dumps(options),
+                                    attempts=0,
+                                    created=datetime.now(),
+                                )
+                                # 使用预加载的群组配置
+                                gc = group_configs.get(group_id) if group_configs else None
+                                await enqueue_delivery(DeliveryJob(
+                                    group_id=group_id,
+                                    userid=userid,
+                                    tweet_id=trueid,
+                                    content=content,
+                                    options={**options, "group_config": gc},
+                                ))
+                                handed_off = True
+
+                        except Exception as e:
+                            had_failure = True
+                            logger.opt(exception=False).error(
+                                f"处理 {group_id} 对 {userid} 的推文 {trueid} 时发生错误: {e}")
+                        finally:
+                            _inflight.discard(id_with_group)
+                            remaining -= 1
+                            # 已交给发送队列的群在发送完毕后释放图片引用
+                            if content_loaded and not handed_off:
+                                media_store.release(content["images"] or ())
+
+            except BaseException:
+                # 含任务被取消
+                had_failure = True
+                raise
+            finally:
+                if config.rsshub_conditional_get:
+                    if had_failure:
+                        validator_store.discard(data["feed_url"])
+                    else:
+                        validator_store.update(data["feed_url"], data.get("validators"), group_id_list)
+
+            logger.debug(media_store.stats())
 
     async def change_config(self):
         config.if_first_time_start = False
 
     async def get_signal(self):
         return str(config.if_first_time_start)
+
+
+# 推送发送队列：刷新流程只投递任务，发送由各群的工作协程完成
+delivery_queue = DeliveryQueue(rss_get().deliver, maxsize=config.delivery_queue_size)
+# 汇总模式的群收集到的推文：{汇总周期编号: {群号: 推文}}，周期结束后由 flush_digests 合并投递
+digest_buffer: dict[int, dict[int, list[DeliveryJob]]] = {}
+# 已写入待发送记录、正在投递（可能等待队列空位）的记录
+_inflight: set[str] = set()
+# 发送失败的待发送记录下次可重投的时间（monotonic）
+_retry_at: dict[str, float] = {}
+
+
+def _is_pending(key: str) -> bool:
+    """记录已在发送队列、汇总缓冲区中或正在投递"""
+    if key in delivery_queue or key in _inflight:
+        return True
+    return any(job.key == key for groups in digest_buffer.values() for jobs in groups.values() for job in jobs)
+
+
+def _digest_cycle() -> int:
+    """当前汇总周期编号：按 digest_interval 对齐的时间段，与定时任务的触发节奏无关"""
+    return int(time.time() // (max(1, config.digest_interval) * 60))
+
+
+async def enqueue_delivery(job: DeliveryJob):
+    """投递发送任务，开启汇总的群先放入汇总缓冲区"""
+    if _parse_group_config(job.options.get("group_config"))["if_need_digest"]:
+        digest_buffer.setdefault(_digest_cycle(), {}).setdefault(job.group_id, []).append(job)
+    else:
+        await delivery_queue.put(job)
+
+
+async def flush_digests(force: bool = False) -> int:
+    """
+    将已结束的汇总周期中每个群的推文合并为一个发送任务投递，返回投递的任务数
+    force=True 时连同当前周期一起发送（手动刷新）
+    """
+    current = _digest_cycle()
+    digests = []
+    for cycle in sorted(digest_buffer):
+        if force or cycle < current:
+            for group_id, jobs in digest_buffer.pop(cycle).items():
+                digests.append(DeliveryJob(
+                    group_id=group_id,
+                    userid=jobs[0].userid,
+                    tweet_id=f"digest:{len(jobs)}",
+                    content=None,
+                    options={},
+                    digest=tuple(jobs),
+                ))
+    # 等待队列空位期间仍视为处理中
+    for job in digests:
+        _inflight.update(job.keys)
+    try:
+        for job in digests:
+            await delivery_queue.put(job)
+            _inflight.difference_update(job.keys)
+    finally:
+        for job in digests:
+            _inflight.difference_update(job.keys)
+    return len(digests)
+
+
+async def _record_delivery_failure(key: str, summary: str | None):
+    """记录发送失败并按退避时间安排重投，超过最大次数后放弃并写入 Detail"""
+    async with get_session() as db_session:
+        attempts = await OutboxManager.record_failure(db_session, key)
+        if attempts >= config.outbox_max_attempts:
+            logger.error(f"{key} 已失败 {attempts} 次，放弃发送")
+            await OutboxManager.complete(db_session, key, summary, datetime.now())
+            _retry_at.pop(key, None)
+        else:
+            delay = backoff(OUTBOX_POLICY, max(1, attempts))
+            _retry_at[key] = time.monotonic() + delay
+            logger.warning(f"{key} 第 {attempts} 次发送失败，{delay:.0f}s 后重新投递")
+
+
+async def replay_outbox(due_only: bool = False) -> int:
+    """
+    重放待发送记录
+    bot 连接时重放全部记录（上次运行中断或发送失败的推文）；定时任务中 due_only=True，
+    只重投已到重试时间的失败记录。已在队列、汇总缓冲区中或正在投递的记录跳过；返回投递数量
+    """
+    async with get_session() as db_session:
+        rows = await OutboxManager.get_all(db_session)
+        if not rows:
+            return 0
+        now = time.monotonic()
+        rows = [
+            row for row in rows
+            if not _is_pending(row.id) and (not due_only or _retry_at.get(row.id, 0) <= now)
+        ]
+        if not rows:
+            return 0
+        group_configs = await GroupconfigManager.get_all_configs(db_session)
+
+    count = 0
+    contents = {}
+    for row in rows:
+        # 读取内容期间其它流程可能已投递
+        if _is_pending(row.id):
+            continue
+        _retry_at.pop(row.id, None)
+        _inflight.add(row.id)
+        try:
+            if row.tweet_id not in contents:
+                contents[row.tweet_id] = await get_text(row.tweet_id)
+            content = contents[row.tweet_id]
+            media_store.retain(content["images"] or ())
+            await enqueue_delivery(DeliveryJob(
+                group_id=row.group_id,
+                userid=row.userid,
+                tweet_id=row.tweet_id,
+                content=content,
+                options={**json.loads(row.options or "{}"), "group_config": group_configs.get(row.group_id)},
+            ))
+            count += 1
+        except Exception as e:
+            logger.opt(exception=False).error(f"重放待发送记录 {row.id} 失败: {e}")
+            await _record_delivery_failure(row.id, None)
+        finally:
+            _inflight.discard(row.id)
+    # 汇总模式的群重投的推文随当前汇总周期一起发送
+    if count:
+        logger.info(f"已重放 {count} 条待发送推文")
+    return count
@@ -0,0 +1,151 @@
+import time
+from collections import deque
+
+from nonebot.log import logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+EWMA_ALPHA = 0.3  # 延迟/错误率滑动平均权重
+LATENCY_SAMPLES = 50  # 用于计算延迟分位数的样本数
+
+
+class HostHealth:
+    """单个 RSSHub 实例的健康状态与熔断器"""
+
+    def __init__(self, host: str, order: int):
+        self.host = host
+        self.order = order  # 配置中的顺序，健康度相同时主地址优先
+        self.latency: float | None = None  # 请求耗时滑动平均（秒）
+        self.error_rate = 0.0  # 失败率滑动平均
+        self.failures = 0  # 连续失败次数
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probe_started: float | None = None  # 半开状态下探测请求的开始时间
+        self.samples: deque[float] = deque(maxlen=LATENCY_SAMPLES)  # 最近请求耗时
+
+    def score(self) -> float:
+        """分数越低越优先：平均延迟按错误率加权，尚未请求过的地址排在已知地址之后"""
+        if self.latency is None:
+            return float("inf")
+        return self.latency * (1 + 4 * self.error_rate)
+
+    def latency_percentile(self, percentile: float) -> float | None:
+        """最近请求耗时的分位数，无样本时返回 None"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(percentile * len(ordered)), len(ordered) - 1)]
+
+    def observe(self, latency: float):
+        self.latency = self._ewma(self.latency, latency)
+        self.samples.append(latency)
+
+    def _ewma(self, old: float | None, value: float) -> float:
+        return value if old is None else old + EWMA_ALPHA * (value - old)
+
+
+class HostPool:
+    """
+    RSSHub 地址池
+    记录各实例的延迟、错误率与熔断状态，每次请求按健康度选择地址，并记住各平台最近一次成功的地址
+    熔断打开后在冷却期内不再请求该地址，冷却结束只放行一次探测请求
+    """
+
+    def __init__(self, hosts: list[str], threshold: int, cooldown: float):
+        """
+        Args:
+            hosts: RSSHub 地址列表，第一个为主地址
+            threshold: 连续失败多少次后打开熔断
+            cooldown: 熔断冷却时间（秒）
+        """
+        self.hosts: dict[str, HostHealth] = {}
+        for host in hosts:
+            if host and host not in self.hosts:
+                self.hosts[host] = HostHealth(host, len(self.hosts))
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.last_good: dict[str, str] = {}
+        # 对冲请求统计：发出的对冲次数，以及对冲请求先于主请求返回的次数
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def candidates(self, platform: str) -> list[str]:
+        """按优先级返回当前可尝试的地址，熔断中的地址不返回"""
+        now = time.monotonic()
+        available = []
+        for health in self.hosts.values():
+            if health.state == OPEN and now - health.opened_at >= self.cooldown:
+                health.state = HALF_OPEN
+                health.probe_started = None
+                logger.info(f"RSSHub 地址 {health.host} 熔断冷却结束，允许探测")
+            if health.state != OPEN:
+                available.append(health)
+        available.sort(key=lambda h: (h.score(), h.order))
+
+        last_good = self.hosts.get(self.last_good.get(platform))
+        if last_good in available and last_good.state == CLOSED:
+            available.remove(last_good)
+            available.insert(0, last_good)
+        return [health.host for health in available]
+
+    def allow(self, host: str) -> bool:
+        """请求前调用：半开状态同一时间只放行一个探测请求"""
+        health = self.hosts[host]
+        if health.state == CLOSED:
+            return True
+        if health.state == OPEN:
+            return False
+        now = time.monotonic()
+        # 探测请求被取消时不会回报结果，超过冷却时间视为放弃
+        if health.probe_started is not None and now - health.probe_started < self.cooldown:
+            return False
+        health.probe_started = now
+        return True
+
+    def record_success(self, host: str, latency: float, platform: str | None = None):
+        """记录成功请求，platform 不为空时记为该平台最近可用地址"""
+        health = self.hosts[host]
+        health.observe(latency)
+        health.error_rate = health._ewma(health.error_rate, 0.0)
+        health.failures = 0
+        if health.state != CLOSED:
+            logger.success(f"RSSHub 地址 {host} 已恢复，关闭熔断")
+        health.state = CLOSED
+        health.probe_started = None
+        if platform:
+            self.last_good[platform] = host
+
+    def record_failure(self, host: str, latency: float | None = None) -> bool:
+        """
+        记录失败请求
+
+        Returns:
+            bool: 本次失败是否导致熔断打开
+        """
+        health = self.hosts[host]
+        if latency is not None:
+            health.observe(latency)
+        health.error_rate = health._ewma(health.error_rate, 1.0)
+        health.failures += 1
+        health.probe_started = None
+        if health.state == HALF_OPEN or (health.state == CLOSED and health.failures >= self.threshold):
+            health.state = OPEN
+            health.opened_at = time.monotonic()
+            logger.warning(f"RSSHub 地址 {host} 连续失败 {health.failures} 次，熔断 {self.cooldown:.0f} 秒")
+            return True
+        return False
+
+    def record_cancelled(self, host: str, elapsed: float):
+        """对冲中落败被取消的请求：耗时只是下限，但仍计入样本，使对冲阈值随实例变慢而上调"""
+        health = self.hosts[host]
+        health.observe(elapsed)
+        health.probe_started = None
+
+    def hedge_delay(self, host: str, percentile: float, min_delay: float, default_delay: float) -> float:
+        """主请求等待多久未返回时发出对冲请求"""
+        value = self.hosts[host].latency_percentile(percentile)
+        if value is None:
+            return default_delay
+        return max(value, min_delay)
@@ -0,0 +1,133 @@
+"""
+推文 HTML 单次遍历提取
+
+一次遍历同时得到：全文纯文本、去除引用块（div.rsshub-quote）后的纯文本、是否为引用推文、图片地址。
+文本拼接方式与 BeautifulSoup 的 get_text("\\n") 一致：各文本节点以换行连接。
+优先使用 lxml 解析，未安装时回退到标准库 html.parser。
+"""
+from functools import lru_cache
+from html.parser import HTMLParser
+from typing import NamedTuple
+
+try:
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+QUOTE_CLASS = "rsshub-quote"
+SKIP_TAGS = {"script", "style", "template"}
+
+
+class ExtractedHtml(NamedTuple):
+    text: str  # 全文纯文本（未去除首尾空白）
+    clean_text: str  # 去除引用块后的纯文本（未去除首尾空白）
+    is_quote: bool  # 是否包含引用块
+    images: tuple[str, ...]  # <img> 图片地址（包括引用块内）
+
+
+def _is_quote_div(tag: str, class_attr: str | None) -> bool:
+    return tag == "div" and QUOTE_CLASS in (class_attr or "").split()
+
+
+class _Collector:
+    def __init__(self):
+        self.texts: list[str] = []
+        self.clean_texts: list[str] = []
+        self.images: list[str] = []
+        self.is_quote = False
+
+    def add_text(self, text: str, in_quote: bool):
+        self.texts.append(text)
+        if not in_quote:
+            self.clean_texts.append(text)
+
+    def result(self) -> ExtractedHtml:
+        return ExtractedHtml(
+            text="\n".join(self.texts),
+            clean_text="\n".join(self.clean_texts),
+            is_quote=self.is_quote,
+            images=tuple(self.images),
+        )
+
+
+def _walk_lxml(element, in_quote: bool, collector: _Collector):
+    for child in element:
+        tag = child.tag
+        # 注释与处理指令的 tag 不是字符串，只保留其后的文本
+        if isinstance(tag, str):
+            child_quote = in_quote or _is_quote_div(tag, child.get("class"))
+            if child_quote and not in_quote:
+                collector.is_quote = True
+            if tag == "img" and child.get("src"):
+                collector.images.append(child.get("src"))
+            if tag not in SKIP_TAGS:
+                if child.text:
+                    collector.add_text(child.text, child_quote)
+                _walk_lxml(child, child_quote, collector)
+        if child.tail:
+            collector.add_text(child.tail, in_quote)
+
+
+def _extract_lxml(html: str) -> ExtractedHtml:
+    collector = _Collector()
+    root = lxml.html.fragment_fromstring(html, create_parent="div")
+    if root.text:
+        collector.add_text(root.text, False)
+    _walk_lxml(root, False, collector)
+    return collector.result()
+
+
+class _HtmlParserWalker(HTMLParser):
+    """标准库解析器：按事件流遍历，用嵌套深度跟踪是否位于引用块内"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.collector = _Collector()
+        self.quote_depth = 0
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "img" and attrs.get("src"):
+            self.collector.images.append(attrs["src"])
+        elif tag == "div":
+            if self.quote_depth:
+                self.quote_depth += 1
+            elif _is_quote_div(tag, attrs.get("class")):
+                self.quote_depth = 1
+                self.collector.is_quote = True
+        elif tag in SKIP_TAGS:
+            self.skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag == "div" and self.quote_depth:
+            self.quote_depth -= 1
+        elif tag in SKIP_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.collector.add_text(data, bool(self.quote_depth))
+
+
+def _extract_html_parser(html: str) -> ExtractedHtml:
+    walker = _HtmlParserWalker()
+    walker.feed(html)
+    walker.close()
+    return walker.collector.result()
+
+
+@lru_cache(maxsize=256)
+def extract_html(html: str) -> ExtractedHtml:
+    """
+    提取推文 HTML，结果按原文缓存，同一条推文在判断引用、清理文本、翻译、提取图片时只解析一次
+    """
+    if not html:
+        return ExtractedHtml("", "", False, ())
+    if LXML_AVAILABLE:
+        try:
+            return _extract_lxml(html)
+        except (ValueError, lxml.etree.ParserError):
+            pass
+    return _extract_html_parser(html)
@@ -0,0 +1,61 @@
+"""
+图片压缩
+
+发送前将图片缩放到指定最长边并重新编码为 JPEG / WebP，减少经 OneBot 上传的数据量。
+动图（GIF / 动态 WebP）保持原样；压缩后体积没有变小时也保留原图。
+未安装 Pillow 时直接返回原图。
+
+本模块不依赖插件其它模块，可在工作进程中直接运行。
+"""
+from io import BytesIO
+
+try:
+    from PIL import Image, ImageOps, UnidentifiedImageError
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+FORMATS = {"jpeg": "JPEG", "webp": "WEBP"}
+
+
+def _flatten(img, fmt: str):
+    """JPEG 不支持透明通道，带透明度的图片铺在白底上"""
+    if fmt == "JPEG":
+        if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+            rgba = img.convert("RGBA")
+            background = Image.new("RGB", rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            return background
+        if img.mode not in ("RGB", "L"):
+            return img.convert("RGB")
+    elif img.mode not in ("RGB", "RGBA", "L"):
+        return img.convert("RGBA")
+    return img
+
+
+def process_image(data: bytes, max_edge: int, fmt: str = "jpeg", quality: int = 85) -> bytes:
+    """
+    缩放并重新编码图片（可在子进程中执行）
+    Args:
+        data: 原图数据
+        max_edge: 最长边像素上限，0 表示不缩放
+        fmt: "jpeg" 或 "webp"
+        quality: 编码质量 1-95
+    """
+    if not PIL_AVAILABLE:
+        return data
+    target = FORMATS.get(fmt.lower(), "JPEG")
+    try:
+        with Image.open(BytesIO(data)) as img:
+            if getattr(img, "is_animated", False) or img.format == "GIF":
+                return data
+            img = ImageOps.exif_transpose(img)
+            if max_edge and max(img.size) > max_edge:
+                img.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+            img = _flatten(img, target)
+            out = BytesIO()
+            img.save(out, format=target, quality=quality, optimize=True)
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError):
+        return data
+    result = out.getvalue()
+    return result if len(result) < len(data) else data
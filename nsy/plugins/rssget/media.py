@@ -0,0 +1,187 @@
+import asyncio
+from contextlib import contextmanager
+
+from nonebot import get_plugin_config
+from nonebot.log import logger
+
+from .config import Config
+from .image_process import process_image
+from .media_cache import DiskMediaCache, SharedMediaDir
+from .network import NetworkManager
+from .workers import WorkerPool
+
+config = get_plugin_config(Config)
+
+
+class MediaProcessor:
+    """图片压缩阶段，在执行池中运行，不阻塞事件循环"""
+
+    def __init__(self, pool: WorkerPool, max_edge: int, fmt: str, quality: int):
+        self.pool = pool
+        self.max_edge = max_edge
+        self.fmt = fmt.lower()
+        self.quality = quality
+        self.saved_bytes = 0
+
+    @property
+    def variant(self) -> str:
+        """压缩参数标识，作为缓存键的一部分，参数变化后不会读到旧结果"""
+        return f"{self.fmt}-{self.max_edge}-q{self.quality}"
+
+    async def run(self, data: bytes) -> bytes:
+        result = await self.pool.run(process_image, data, self.max_edge, self.fmt, self.quality)
+        self.saved_bytes += len(data) - len(result)
+        return result
+
+
+class _MediaItem:
+    __slots__ = ("refs", "task")
+
+    def __init__(self):
+        self.refs = 0
+        self.task: asyncio.Task | None = None
+
+
+class MediaStore:
+    """
+    推送周期内的图片共享存储
+    同一张图片只下载一次，由所有待发送的群共享；每个群发送完毕后释放引用，
+    最后一个群发送完毕时丢弃图片数据，内存占用只与当前推文的图片数量相关
+    下载前先查本地图片缓存，命中时不产生网络请求；启用压缩时缓存的是压缩后的图片
+    配置共享目录时图片写入该目录，get() 返回 file:// 地址而不是图片数据
+    """
+
+    def __init__(
+            self,
+            disk_cache: DiskMediaCache | None = None,
+            processor: MediaProcessor | None = None,
+            concurrency: int = 4,
+            shared_dir: SharedMediaDir | None = None,
+    ):
+        self._items: dict[str, _MediaItem] = {}
+        self.disk_cache = disk_cache
+        self.processor = processor
+        self.shared_dir = shared_dir
+        self._limit = asyncio.Semaphore(max(1, concurrency))
+        self.downloads = 0
+        self.hits = 0
+
+    def retain(self, urls, count: int = 1):
+        """为 urls 中的每张图片增加 count 个引用（每个待发送的群一个）"""
+        if count <= 0:
+            return
+        for url in urls:
+            item = self._items.get(url)
+            if item is None:
+                item = self._items[url] = _MediaItem()
+            item.refs += count
+
+    def release(self, urls, count: int = 1):
+        """释放引用，引用归零时丢弃图片数据"""
+        for url in urls:
+            item = self._items.get(url)
+            if item is None:
+                continue
+            item.refs -= count
+            if item.refs <= 0:
+                del self._items[url]
+                if item.task is not None and not item.task.done():
+                    item.task.cancel()
+
+    @contextmanager
+    def hold(self, urls):
+        """在 with 块内保留一组图片并开始预取，退出时释放"""
+        urls = list(urls or ())
+        self.retain(urls)
+        self.prefetch(urls)
+        try:
+            yield
+        finally:
+            self.release(urls)
+
+    def _start(self, item: _MediaItem, url: str):
+        self.downloads += 1
+        item.task = asyncio.create_task(self._load(url))
+        # 预取失败时可能无人等待，主动取走异常避免 "exception was never retrieved" 警告
+        item.task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    def prefetch(self, urls):
+        """
+        提前在后台获取已被引用的图片，按 urls 顺序排队，同时进行的获取数受并发上限约束
+        之后 get() 直接等待对应的任务，图片通常在文字消息发送完成前就已就绪
+        """
+        for url in urls or ():
+            item = self._items.get(url)
+            if item is not None and item.task is None:
+                self._start(item, url)
+
+    async def get(self, url: str) -> bytes | str:
+        """
+        获取图片数据（共享目录模式下为 file:// 地址），可直接传给 MessageSegment.image
+        已被引用的图片只下载一次，并发请求共享同一个下载任务；下载失败后下次调用会重新下载
+        未被引用的图片直接下载，不做保留
+        """
+        item = self._items.get(url)
+        if item is None:
+            self.downloads += 1
+            return await self._load(url)
+
+        if item.task is None or (item.task.done() and (item.task.cancelled() or item.task.exception())):
+            self._start(item, url)
+        else:
+            self.hits += 1
+        # shield：某个群的发送被取消时不影响其它群共享的下载
+        return await asyncio.shield(item.task)
+
+    async def _load(self, url: str) -> bytes | str:
+        async with self._limit:
+            data = await self._load_bytes(url)
+            if self.shared_dir is not None:
+                return await self.shared_dir.put(data)
+            return data
+
+    async def _load_bytes(self, url: str) -> bytes:
+        key = url if self.processor is None else f"{url}#{self.processor.variant}"
+        if self.disk_cache is not None:
+            data = await self.disk_cache.get(key)
+            if data is not None:
+                return data
+        data = await self._download(url)
+        if self.processor is not None:
+            data = await self.processor.run(data)
+        if self.disk_cache is not None:
+            await self.disk_cache.put(key, data)
+        return data
+
+    @staticmethod
+    async def _download(url: str) -> bytes:
+        client = NetworkManager.get_client("media")
+        resp = await client.get(url)
+        resp.raise_for_status()
+        logger.debug(f"图片下载完成 {len(resp.content)} bytes: {url}")
+        return resp.content
+
+    def stats(self) -> str:
+        msg = f"图片获取 {self.downloads} 次，复用 {self.hits} 次，当前保留 {len(self._items)} 张"
+        if self.disk_cache is not None:
+            msg += f"；本地缓存命中 {self.disk_cache.hits} 次，未命中 {self.disk_cache.misses} 次"
+        if self.processor is not None:
+            msg += f"；压缩节省 {self.processor.saved_bytes / 1024 / 1024:.1f} MB"
+        return msg
+
+
+media_pool = WorkerPool(config.media_process_executor, config.media_process_workers, name="media-processor")
+
+media_store = MediaStore(
+    DiskMediaCache(max_bytes=config.media_cache_max_bytes) if config.media_cache_enabled else None,
+    MediaProcessor(
+        media_pool,
+        max_edge=config.media_max_edge,
+        fmt=config.media_format,
+        quality=config.media_quality,
+    ) if config.media_process else None,
+    concurrency=config.media_prefetch_concurrency,
+    shared_dir=SharedMediaDir(
+        config.media_shared_dir, config.media_shared_uri_prefix
+    ) if config.media_delivery == "file" else None,
+)
@@ -0,0 +1,202 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+
+from nonebot.log import logger
+
+MEDIA_CACHE_DIR = "data/media_cache"
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _atomic_write(path: str, data: bytes):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class DiskMediaCache:
+    """
+    本地图片缓存（内容寻址）
+    urls/<地址哈希> 中记录图片内容哈希，blobs/<内容哈希> 存放图片数据，
+    不同地址的相同图片只保存一份；超出容量时按最近访问时间（mtime）淘汰最久未使用的图片，
+    所有写入均先写临时文件再替换，进程中途退出不会留下损坏的文件
+    """
+
+    def __init__(self, root: str = MEDIA_CACHE_DIR, max_bytes: int = 512 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._url_dir = os.path.join(root, "urls")
+        self._blob_dir = os.path.join(root, "blobs")
+        self._lock = threading.Lock()
+        self._total: int | None = None  # 首次写入时扫描统计
+        self.hits = 0
+        self.misses = 0
+
+    def _url_path(self, key: str) -> str:
+        return os.path.join(self._url_dir, _digest(key.encode()))
+
+    def _blob_path(self, content_hash: str) -> str:
+        return os.path.join(self._blob_dir, content_hash)
+
+    def _read(self, key: str) -> bytes | None:
+        url_path = self._url_path(key)
+        try:
+            with open(url_path, "r", encoding="utf-8") as f:
+                blob_path = self._blob_path(f.read().strip())
+            with open(blob_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            # 图片已被淘汰，清理失效的地址索引
+            if os.path.exists(url_path):
+                try:
+                    os.remove(url_path)
+                except OSError:
+                    pass
+            return None
+        except OSError as e:
+            logger.warning(f"读取图片缓存失败: {e}")
+            return None
+        # 更新访问时间，供 LRU 淘汰使用
+        now = time.time()
+        try:
+            os.utime(blob_path, (now, now))
+        except OSError:
+            pass
+        return data
+
+    def _scan_total(self) -> int:
+        total = 0
+        with os.scandir(self._blob_dir) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    total += entry.stat().st_size
+        return total
+
+    def _write(self, key: str, data: bytes):
+        os.makedirs(self._url_dir, exist_ok=True)
+        os.makedirs(self._blob_dir, exist_ok=True)
+        content_hash = _digest(data)
+        blob_path = self._blob_path(content_hash)
+        with self._lock:
+            if self._total is None:
+                self._total = self._scan_total()
+            if os.path.exists(blob_path):
+                now = time.time()
+                os.utime(blob_path, (now, now))
+            else:
+                _atomic_write(blob_path, data)
+                self._total += len(data)
+            _atomic_write(self._url_path(key), content_hash.encode())
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """按 mtime 从旧到新删除图片，直到占用降到容量的 90%"""
+        target = int(self.max_bytes * 0.9)
+        blobs = []
+        with os.scandir(self._blob_dir) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    blobs.append((stat.st_mtime, stat.st_size, entry.path))
+        blobs.sort()
+        total = sum(size for _, size, _ in blobs)
+        removed = 0
+        for _, size, path in blobs:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self._total = total
+        # 地址索引体积很小，读取时发现图片不存在再清理
+        logger.info(f"图片缓存淘汰 {removed} 个文件，当前占用 {total / 1024 / 1024:.1f} MB")
+
+    async def get(self, key: str) -> bytes | None:
+        data = await asyncio.to_thread(self._read, key)
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+
+    async def put(self, key: str, data: bytes):
+        try:
+            await asyncio.to_thread(self._write, key, data)
+        except OSError as e:
+            logger.warning(f"写入图片缓存失败: {e}")
+
+
+def _sniff_ext(data: bytes) -> str:
+    if data[:3] == b"\xff\xd8\xff":
+        return ".jpg"
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return ".png"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return ".gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return ".webp"
+    return ".img"
+
+
+class SharedMediaDir:
+    """
+    与 OneBot 实现（NapCat）共享的图片目录
+    图片按内容哈希命名写入一次，之后以 file:// 路径发送，不再经 WebSocket 传输 base64 数据；
+    超过保留时间未被使用的文件由定时任务清理
+    """
+
+    def __init__(self, root: str, uri_prefix: str | None = None):
+        """
+        Args:
+            root: bot 侧的共享目录路径
+            uri_prefix: OneBot 侧看到的同一目录的绝对路径，为空时使用 bot 侧绝对路径
+        """
+        self.root = root
+        self.uri_prefix = (uri_prefix or os.path.abspath(root)).rstrip("/")
+
+    def _write(self, data: bytes) -> str:
+        os.makedirs(self.root, exist_ok=True)
+        name = f"{_digest(data)}{_sniff_ext(data)}"
+        path = os.path.join(self.root, name)
+        if os.path.exists(path):
+            # 刷新修改时间，推迟清理
+            now = time.time()
+            os.utime(path, (now, now))
+        else:
+            _atomic_write(path, data)
+        return f"file://{self.uri_prefix}/{name}"
+
+    async def put(self, data: bytes) -> str:
+        """写入图片并返回 OneBot 侧可访问的 file:// 地址"""
+        return await asyncio.to_thread(self._write, data)
+
+    def _gc(self, retention: float) -> int:
+        if not os.path.isdir(self.root):
+            return 0
+        deadline = time.time() - retention
+        removed = 0
+        with os.scandir(self.root) as it:
+            for entry in it:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < deadline:
+                        os.remove(entry.path)
+                        removed += 1
+                except OSError:
+                    continue
+        return removed
+
+    async def gc(self, retention: float):
+        """删除超过保留时间（秒）的文件"""
+        removed = await asyncio.to_thread(self._gc, retention)
+        if removed:
+            logger.info(f"共享图片目录清理 {removed} 个过期文件")
@@ -1,5 +1,5 @@
 from nonebot_plugin_orm import Model
-from sqlalchemy import Column, String, Text, DateTime, INT, BOOLEAN
+from sqlalchemy import Column, String, Text, DateTime, INT, BOOLEAN, false
 
 
 class Detail(Model):
@@ -45,4 +45,24 @@ class Groupconfig(Model):
     if_need_self_trans = Column(BOOLEAN, nullable=False)
     if_need_translate = Column(BOOLEAN, nullable=False)
     if_need_photo_num_mention = Column(BOOLEAN, nullable=False)
-    if_need_merged_message = Column(BOOLEAN, nullable=False)
\ No newline at end of file
+    if_need_merged_message = Column(BOOLEAN, nullable=False)
+    if_need_digest = Column(BOOLEAN, nullable=False, default=False, server_default=false())  # 每周期汇总为一条合并转发
+
+class Outbox(Model):
+    __tablename__ = "Outbox"
+    id = Column(String(255), primary_key=True, nullable=False)  # {推文id}-{群号}，与 Detail 相同
+    tweet_id = Column(String(255), nullable=False)
+    userid = Column(String(255), nullable=False)
+    group_id = Column(INT, nullable=False)
+    options = Column(Text, nullable=True)  # 发送参数（JSON）
+    attempts = Column(INT, nullable=False, default=0)  # 已失败次数
+    created = Column(DateTime, nullable=True)
+
+class TranslationCache(Model):
+    __tablename__ = "Translation_cache"
+    id = Column(String(64), primary_key=True, nullable=False)  # sha256(规范化原文, 翻译平台, 模型, 源语言, 目标语言)
+    provider = Column(String(32), nullable=False)
+    model = Column(String(255), nullable=False)
+    target = Column(String(16), nullable=False)
+    trans_text = Column(Text, nullable=False)
+    last_used = Column(DateTime, nullable=False, index=True)  # 最近使用时间，按此淘汰
@@ -1,10 +1,10 @@
 from typing import Optional
 
 from nonebot_plugin_orm import async_scoped_session
-from sqlalchemy import delete, select, text
+from sqlalchemy import delete, func, select, text
 
-from .models import (Content, Detail, Groupconfig, Plantform,  # 导入你的模型定义
-                     Subscribe, User)
+from .models import (Content, Detail, Groupconfig, Outbox,  # 导入你的模型定义
+                     Plantform, Subscribe, TranslationCache, User)
 
 
 class DetailManager:
@@ -208,6 +208,14 @@ class ContentManager:
         result = await db_session.execute(text("SELECT 1 FROM Content LIMIT 1"))
         return not result.fetchone()
 
+    @classmethod
+    async def get_recent_times(cls, session: async_scoped_session, username: str, since: str) -> list[str]:
+        """获取指定用户在 since 之后的推文时间（Content.time 为可按字符串排序的格式）"""
+        result = await session.execute(
+            select(Content.time).where(Content.username == username, Content.time >= since)
+        )
+        return [row[0] for row in result]
+
     @classmethod
     async def create_signmsg(cls, session: async_scoped_session, **kwargs) -> Content:
         """创建新的数据"""
@@ -257,3 +265,77 @@ class GroupconfigManager:
             await session.commit()
             return True
         return False
+
+
+class OutboxManager:
+    @classmethod
+    async def get_all(cls, session: async_scoped_session) -> list[Outbox]:
+        """获取所有待发送记录（按创建时间排序）"""
+        result = await session.execute(select(Outbox).order_by(Outbox.created))
+        return list(result.scalars().all())
+
+    @classmethod
+    async def get_existing_ids(cls, session: async_scoped_session, ids: list[str]) -> set[str]:
+        """批量检查待发送记录"""
+        if not ids:
+            return set()
+        result = await session.execute(select(Outbox.id).where(Outbox.id.in_(ids)))
+        return {row[0] for row in result}
+
+    @classmethod
+    async def create_signmsg(cls, session: async_scoped_session, **kwargs) -> Outbox:
+        """创建新的数据"""
+        new_signmsg = Outbox(**kwargs)
+        session.add(new_signmsg)
+        await session.commit()
+        return new_signmsg
+
+    @classmethod
+    async def complete(cls, session: async_scoped_session, id: str, summary: str | None, updated) -> None:
+        """发送成功：在同一事务中写入 Detail 并删除待发送记录，Detail 已存在时不重复写入"""
+        if await session.get(Detail, id) is None:
+            session.add(Detail(id=id, summary=summary, updated=updated))
+        await session.execute(delete(Outbox).where(Outbox.id == id))
+        await session.commit()
+
+    @classmethod
+    async def record_failure(cls, session: async_scoped_session, id: str) -> int:
+        """记录一次发送失败，返回累计失败次数"""
+        row = await session.get(Outbox, id)
+        if row is None:
+            return 0
+        attempts = (row.attempts or 0) + 1
+        row.attempts = attempts
+        await session.commit()
+        return attempts
+
+
+class TranslationCacheManager:
+    @classmethod
+    async def get(cls, session: async_scoped_session, id: str, now) -> Optional[str]:
+        """查询缓存的译文，命中时更新最近使用时间"""
+        row = await session.get(TranslationCache, id)
+        if row is None:
+            return None
+        trans_text = row.trans_text
+        row.last_used = now
+        await session.commit()
+        return trans_text
+
+    @classmethod
+    async def put(cls, session: async_scoped_session, **kwargs) -> None:
+        """写入译文，已存在时覆盖"""
+        await session.merge(TranslationCache(**kwargs))
+        await session.commit()
+
+    @classmethod
+    async def evict(cls, session: async_scoped_session, max_entries: int) -> int:
+        """超出容量时按最近使用时间删除最旧的记录，降到容量的 90%，返回删除数量"""
+        total = (await session.execute(select(func.count()).select_from(TranslationCache))).scalar_one()
+        if total <= max_entries:
+            return 0
+        excess = total - int(max_entries * 0.9)
+        oldest = select(TranslationCache.id).order_by(TranslationCache.last_used).limit(excess)
+        await session.execute(delete(TranslationCache).where(TranslationCache.id.in_(oldest)))
+        await session.commit()
+        return excess
@@ -0,0 +1,118 @@
+import asyncio
+
+import httpx
+from nonebot.log import logger
+
+try:
+    import h2  # noqa: F401  httpx 的 HTTP/2 支持依赖 h2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# 各用途连接池配置
+# per_host: 单个目标主机的最大并发请求数；keepalive: 空闲长连接保留时间（秒）
+PROFILES = {
+    "default": {"timeout": 30.0, "max_connections": 20, "max_keepalive": 10, "keepalive": 30.0, "per_host": 10},
+    # RSSHub：请求集中在少数几个实例，长连接保持久一些
+    "rsshub": {"timeout": 30.0, "max_connections": 50, "max_keepalive": 20, "keepalive": 60.0, "per_host": 10},
+    # 图片 CDN：单条推文最多数张图，限制单主机并发避免被限速
+    "media": {"timeout": 20.0, "max_connections": 30, "max_keepalive": 10, "keepalive": 30.0, "per_host": 8},
+    # 翻译接口：大模型响应慢，超时放宽
+    "translate": {"timeout": 120.0, "max_connections": 10, "max_keepalive": 5, "keepalive": 60.0, "per_host": 4},
+}
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """响应体读取完毕或关闭时释放主机并发名额"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self._stream = stream
+        self._release = release
+
+    def _done(self):
+        if self._release is not None:
+            self._release()
+            self._release = None
+
+    async def __aiter__(self):
+        try:
+            async for chunk in self._stream:
+                yield chunk
+        finally:
+            self._done()
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._done()
+
+
+class _HostLimitedTransport(httpx.AsyncBaseTransport):
+    """在底层连接池之上按目标主机限制并发请求数"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, per_host: int):
+        self._transport = transport
+        self._per_host = per_host
+        self._slots: dict[str, asyncio.Semaphore] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        slot = self._slots.get(request.url.host)
+        if slot is None:
+            slot = self._slots[request.url.host] = asyncio.Semaphore(self._per_host)
+        await slot.acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            slot.release()
+            raise
+        if isinstance(response.stream, httpx.ByteStream):
+            # 响应体已在内存中，不再占用连接
+            slot.release()
+        else:
+            response.stream = _ReleasingStream(response.stream, slot.release)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class NetworkManager:
+    """
+    全局 HTTP 客户端注册表
+    按用途（RSSHub / 图片 / 翻译 / 其它）各维护一个长期复用的连接池，
+    支持 HTTP/2 多路复用与按主机的并发限制；由驱动关闭时统一释放
+    """
+    _clients: dict[str, httpx.AsyncClient] = {}
+
+    @classmethod
+    def get_client(cls, profile: str = "default") -> httpx.AsyncClient:
+        client = cls._clients.get(profile)
+        if client is None or client.is_closed:
+            client = cls._clients[profile] = cls._create(profile)
+        return client
+
+    @classmethod
+    def _create(cls, profile: str) -> httpx.AsyncClient:
+        options = PROFILES.get(profile, PROFILES["default"])
+        limits = httpx.Limits(
+            max_connections=options["max_connections"],
+            max_keepalive_connections=options["max_keepalive"],
+            keepalive_expiry=options["keepalive"],
+        )
+        transport = httpx.AsyncHTTPTransport(http2=HTTP2_AVAILABLE, limits=limits, retries=1)
+        logger.debug(f"创建 {profile} 连接池 (HTTP/2: {HTTP2_AVAILABLE})")
+        return httpx.AsyncClient(
+            transport=_HostLimitedTransport(transport, options["per_host"]),
+            timeout=httpx.Timeout(options["timeout"], connect=10.0),
+            follow_redirects=True,
+        )
+
+    @classmethod
+    async def close(cls):
+        for client in list(cls._clients.values()):
+            if not client.is_closed:
+                await client.aclose()
+        cls._clients.clear()
+        logger.info("网络连接池已关闭")
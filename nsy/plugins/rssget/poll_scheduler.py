@@ -0,0 +1,78 @@
+import heapq
+import time
+from datetime import datetime, timedelta
+
+TIME_FORMAT = "%Y-%m-%d %H:%M"
+
+
+class PollScheduler:
+    """
+    按用户发推频率自适应调整轮询间隔的优先队列
+    活跃用户轮询更频繁，长期不发推的用户降低频率，但间隔不超过 max_interval（最大陈旧时间）
+    """
+
+    def __init__(self, min_interval: int, max_interval: int, lookback_days: int, factor: float):
+        """
+        Args:
+            min_interval: 最短轮询间隔（秒）
+            max_interval: 最长轮询间隔（秒），即可接受的最大延迟
+            lookback_days: 统计发推频率时回溯的天数
+            factor: 轮询间隔与平均发推间隔的比例，越小越及时
+        """
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.lookback_days = lookback_days
+        self.factor = factor
+        self._heap: list[tuple[float, str]] = []
+        self._next_poll: dict[str, float] = {}
+        self._running: set[str] = set()
+
+    def since(self) -> str:
+        """统计窗口起点，格式与 Content.time 一致，可直接用于字符串比较"""
+        return (datetime.now() - timedelta(days=self.lookback_days)).strftime(TIME_FORMAT)
+
+    def sync(self, userids: set[str]):
+        """与当前订阅列表同步：新用户立即轮询，已取消订阅的用户移出队列"""
+        now = time.time()
+        for userid in userids - self._next_poll.keys() - self._running:
+            self._push(userid, now)
+        for userid in self._next_poll.keys() - userids:
+            # 堆中的旧条目在弹出时按 _next_poll 校验后丢弃
+            del self._next_poll[userid]
+
+    def pop_due(self, now: float | None = None) -> list[str]:
+        """取出所有已到轮询时间的用户，处理完成前不会再次出队"""
+        now = time.time() if now is None else now
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            ts, userid = heapq.heappop(self._heap)
+            if self._next_poll.get(userid) != ts:
+                continue
+            del self._next_poll[userid]
+            self._running.add(userid)
+            due.append(userid)
+        return due
+
+    def reschedule(self, userid: str, interval: float):
+        """用户处理完成后按新间隔重新入队"""
+        self._running.discard(userid)
+        self._push(userid, time.time() + interval)
+
+    def compute_interval(self, post_times: list[str]) -> float:
+        """
+        根据回溯窗口内的发推时间计算轮询间隔
+
+        Args:
+            post_times: 窗口内推文时间列表，格式为 "%Y-%m-%d %H:%M"
+
+        Returns:
+            float: 轮询间隔（秒）
+        """
+        if not post_times:
+            return self.max_interval
+        mean_gap = self.lookback_days * 86400 / len(post_times)
+        return min(max(mean_gap * self.factor, self.min_interval), self.max_interval)
+
+    def _push(self, userid: str, ts: float):
+        self._next_poll[userid] = ts
+        heapq.heappush(self._heap, (ts, userid))
@@ -0,0 +1,143 @@
+import asyncio
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from nonebot.log import logger
+
+# 需要限速的 OneBot 发送接口
+SEND_APIS = {"send_group_msg", "send_msg", "send_group_forward_msg", "send_forward_msg"}
+
+# 发送通道：命令回复等交互消息优先于定时推送等批量消息
+INTERACTIVE = 0
+BULK = 1
+# 当前协程的发送通道，默认视为交互消息；推送、广播等批量发送流程中设置为 BULK
+send_lane: ContextVar[int] = ContextVar("send_lane", default=INTERACTIVE)
+
+
+class TokenBucket:
+    """
+    令牌桶：以 rate 个/秒的速度补充令牌，最多积攒 capacity 个
+    等待者按通道排队，同一通道内先来后到；交互通道优先取得令牌，
+    但两个通道同时排队时，交互通道连续取得 priority_burst 个令牌后让批量通道取得一个，避免批量消息饿死
+    """
+
+    def __init__(self, rate: float, capacity: int, priority_burst: int = 5):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.priority_burst = max(1, priority_burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._waiters: tuple[deque[asyncio.Future], ...] = (deque(), deque())
+        self._dispatcher: asyncio.Task | None = None
+        self._skipped = 0  # 批量通道排队期间交互通道连续取得的令牌数
+        self.last_used = self._updated
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _waiting(self) -> bool:
+        return any(self._waiters)
+
+    async def acquire(self, lane: int = INTERACTIVE) -> float:
+        """取一个令牌，返回等待的秒数"""
+        self._refill()
+        if self._tokens >= 1 and not self._waiting():
+            self._tokens -= 1
+            self.last_used = time.monotonic()
+            return 0.0
+
+        start = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(waiter)
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # 令牌已分配但调用方被取消，归还令牌
+                self._tokens = min(self.capacity, self._tokens + 1)
+            else:
+                try:
+                    self._waiters[lane].remove(waiter)
+                except ValueError:
+                    pass
+            raise
+        return time.monotonic() - start
+
+    def _next_lane(self) -> int | None:
+        for waiters in self._waiters:
+            while waiters and waiters[0].done():
+                waiters.popleft()
+        interactive, bulk = self._waiters
+        if interactive and (not bulk or self._skipped < self.priority_burst):
+            if bulk:
+                self._skipped += 1
+            return INTERACTIVE
+        if bulk:
+            self._skipped = 0
+            return BULK
+        return None
+
+    async def _dispatch(self):
+        """按优先级依次为等待者分配令牌，没有等待者时退出"""
+        while True:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                continue
+            lane = self._next_lane()
+            if lane is None:
+                return
+            self._tokens -= 1
+            self.last_used = time.monotonic()
+            self._waiters[lane].popleft().set_result(None)
+
+    @property
+    def idle(self) -> bool:
+        """令牌已补满且无人等待"""
+        self._refill()
+        return self._tokens >= self.capacity and not self._waiting()
+
+
+class SendRateLimiter:
+    """
+    消息发送限速
+    每个群一个令牌桶控制单群发送节奏，另有一个全局令牌桶控制账号整体发送速率；
+    不同群的消息互不等待，可以并行发送；两类令牌桶中交互消息均优先于批量消息
+    """
+
+    def __init__(self, group_rate: float, group_burst: int, global_rate: float, global_burst: int,
+                 priority_burst: int = 5):
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+        self.priority_burst = priority_burst
+        self._global = TokenBucket(global_rate, global_burst, priority_burst)
+        self._groups: dict[int, TokenBucket] = {}
+
+    def _group_bucket(self, group_id: int) -> TokenBucket:
+        bucket = self._groups.get(group_id)
+        if bucket is None:
+            if len(self._groups) > 1024:
+                self._prune()
+            bucket = self._groups[group_id] = TokenBucket(self.group_rate, self.group_burst, self.priority_burst)
+        return bucket
+
+    def _prune(self):
+        """移除已空闲的群令牌桶，避免长期运行时无限增长"""
+        for group_id in [group_id for group_id, bucket in self._groups.items() if bucket.idle]:
+            del self._groups[group_id]
+
+    async def acquire(self, group_id: int | None = None, lane: int | None = None):
+        # 先取群令牌再取全局令牌，单个群排队时不会占住全局令牌
+        if lane is None:
+            lane = send_lane.get()
+        waited = 0.0
+        if group_id is not None:
+            waited += await self._group_bucket(int(group_id)).acquire(lane)
+        waited += await self._global.acquire(lane)
+        if waited > 1:
+            logger.debug(f"群 {group_id} 发送限速等待 {waited:.1f}s（{'交互' if lane == INTERACTIVE else '批量'}）")
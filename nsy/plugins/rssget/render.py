@@ -0,0 +1,76 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import NamedTuple
+
+from nonebot.adapters.onebot.v11 import Message
+
+# 合并转发单个节点的文字长度上限，超出后拆分为多个节点
+MAX_CHAR_PER_NODE = 2000
+
+
+def split_text(text: str, limit: int = MAX_CHAR_PER_NODE) -> list[str]:
+    """按长度上限拆分文字，优先在换行处断开"""
+    parts = []
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit)
+        if cut <= 0:
+            cut = limit
+        parts.append(text[:cut])
+        text = text[cut:].lstrip("\n")
+    if text:
+        parts.append(text)
+    return parts
+
+
+def chunk_groups(groups: list[list], max_items: int) -> list[list[list]]:
+    """
+    将若干组节点装入多条消息，每条消息最多 max_items 个节点；
+    同一组的节点不拆开，单组超过上限时独占一条消息
+    """
+    chunks: list[list[list]] = []
+    size = 0
+    for group in groups:
+        if not chunks or size + len(group) > max_items:
+            chunks.append([])
+            size = 0
+        chunks[-1].append(group)
+        size += len(group)
+    return chunks
+
+
+class RenderedTweet(NamedTuple):
+    messages: tuple[str | Message, ...]  # 依次发送的消息
+    images: tuple[str, ...]  # 文字发送后逐张单独发送的图片地址
+    merged: bool  # 是否为合并转发消息
+
+
+class RenderCache:
+    """
+    推文消息渲染缓存（LRU + TTL）
+    以 (推文id, 影响输出的群组配置) 为键，同一推文的同一种配置组合只构建一次，
+    不同用户、不同轮询批次及重放流程中发往多个群的消息共享同一份对象；
+    超过 ttl 秒的条目重新构建，超出容量时淘汰最久未使用的条目
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: float = 1800):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, RenderedTweet]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: Hashable, build: Callable[[], RenderedTweet]) -> RenderedTweet:
+        now = time.monotonic()
+        item = self._data.get(key)
+        if item is not None and now - item[0] < self.ttl:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+        self.misses += 1
+        rendered = build()
+        self._data[key] = (now, rendered)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+        return rendered
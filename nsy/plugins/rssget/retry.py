@@ -0,0 +1,144 @@
+import asyncio
+import random
+from collections.abc import Awaitable, Callable
+from typing import NamedTuple
+
+import httpx
+from nonebot.adapters.onebot.v11 import ActionFailed, NetworkError
+from nonebot.log import logger
+
+
+class RetryPolicy(NamedTuple):
+    max_attempts: int  # 总尝试次数（含首次）
+    base_delay: float  # 首次重试等待（秒），之后每次翻倍
+    max_delay: float  # 单次等待上限（秒）
+
+
+# 不重试：资源不存在或无权限，重试也不会成功
+NO_RETRY = RetryPolicy(1, 0, 0)
+# 网络抖动 / 超时：尽快重试
+NETWORK_POLICY = RetryPolicy(4, 2.0, 30.0)
+# 源站限流 / 服务端错误：拉长等待
+THROTTLED_POLICY = RetryPolicy(4, 10.0, 120.0)
+# OneBot 发送失败（上传失败、风控等）：少量重试，等待更久
+ONEBOT_POLICY = RetryPolicy(3, 5.0, 60.0)
+# 与 OneBot 实现的连接异常 / 接口超时
+ONEBOT_NETWORK_POLICY = RetryPolicy(4, 3.0, 60.0)
+DEFAULT_POLICY = RetryPolicy(3, 2.0, 30.0)
+# 待发送记录的重投间隔（最大次数由 outbox_max_attempts 决定）
+OUTBOX_POLICY = RetryPolicy(0, 60.0, 1800.0)
+
+
+def policy_for(error: BaseException) -> RetryPolicy:
+    """按异常类型选择重试策略"""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        if status == 429 or status >= 500:
+            return THROTTLED_POLICY
+        return NO_RETRY
+    if isinstance(error, (httpx.TimeoutException, httpx.TransportError)):
+        return NETWORK_POLICY
+    if isinstance(error, NetworkError):
+        return ONEBOT_NETWORK_POLICY
+    if isinstance(error, ActionFailed):
+        return ONEBOT_POLICY
+    return DEFAULT_POLICY
+
+
+def backoff(policy: RetryPolicy, attempt: int) -> float:
+    """第 attempt 次重试前的等待时间：指数退避，取上限后在后一半区间内随机抖动"""
+    delay = min(policy.max_delay, policy.base_delay * (2 ** (attempt - 1)))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class _RetryJob:
+    __slots__ = ("name", "func", "on_give_up", "attempt")
+
+    def __init__(self, name: str, func, on_give_up):
+        self.name = name
+        self.func = func
+        self.on_give_up = on_give_up
+        self.attempt = 0
+
+
+class RetryScheduler:
+    """
+    失败任务重试调度
+    首次执行失败后不在调用方协程中等待，而是按退避时间用定时器重新投递为后台任务，
+    调用方立即返回并继续处理下一个群；等待期间不占用任何协程或发送名额
+    """
+
+    def __init__(self):
+        self._tasks: set[asyncio.Task] = set()
+        self._timers: set[asyncio.TimerHandle] = set()
+        self.retried = 0
+        self.given_up = 0
+
+    async def run(
+            self,
+            name: str,
+            func: Callable[[], Awaitable],
+            on_give_up: Callable[[BaseException], Awaitable] | None = None,
+    ) -> bool:
+        """
+        立即执行一次 func，成功返回 True；失败时按策略安排后台重试并返回 False
+        Args:
+            name: 日志中显示的任务名
+            func: 无参数的异步函数，每次尝试都会重新调用
+            on_give_up: 达到最大尝试次数或遇到不可重试的错误时调用
+        """
+        return await self._attempt(_RetryJob(name, func, on_give_up))
+
+    async def _attempt(self, job: _RetryJob) -> bool:
+        job.attempt += 1
+        try:
+            await job.func()
+            if job.attempt > 1:
+                logger.info(f"{job.name} 第 {job.attempt} 次尝试成功")
+            return True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            policy = policy_for(e)
+            if job.attempt >= policy.max_attempts:
+                self.given_up += 1
+                logger.error(f"{job.name} 失败，已尝试 {job.attempt} 次，放弃: {e}")
+                if job.on_give_up is not None:
+                    try:
+                        await job.on_give_up(e)
+                    except Exception as notify_error:
+                        logger.opt(exception=False).error(f"{job.name} 失败通知发送失败: {notify_error}")
+                return False
+            delay = backoff(policy, job.attempt)
+            self.retried += 1
+            logger.warning(f"{job.name} 失败，{delay:.1f}s 后进行第 {job.attempt} 次重试: {e}")
+            self._schedule(job, delay)
+            return False
+
+    def _schedule(self, job: _RetryJob, delay: float):
+        loop = asyncio.get_running_loop()
+        timer: asyncio.TimerHandle | None = None
+
+        def _fire():
+            self._timers.discard(timer)
+            task = loop.create_task(self._attempt(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        timer = loop.call_later(delay, _fire)
+        self._timers.add(timer)
+
+    @property
+    def pending(self) -> int:
+        """等待重试与正在重试的任务数"""
+        return len(self._timers) + len(self._tasks)
+
+    def shutdown(self):
+        for timer in self._timers:
+            timer.cancel()
+        self._timers.clear()
+        for task in self._tasks:
+            task.cancel()
+
+
+retry_scheduler = RetryScheduler()
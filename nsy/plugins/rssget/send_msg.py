@@ -1,37 +1,33 @@
-import httpx
 from nonebot import get_bot
 from nonebot.log import logger
 from nonebot.adapters.onebot.v11 import MessageSegment, Message
 
+from .media import media_store
+from .retry import retry_scheduler
+
 class SendMsg:
-    async def send_onebot_image(self,img_url: str, group_id, num):
-        """OneBot 专用图片发送方法"""
-        bot = get_bot()
-        num += 1
-        try:
-            async with httpx.AsyncClient(timeout=20) as client:
-                # 下载图片数据
-                resp = await client.get(img_url)
-                resp.raise_for_status()
+    async def send_onebot_image(self,img_url: str, group_id):
+        """OneBot 专用图片发送方法，失败后由重试调度器在后台重试"""
+        async def _send():
+            # 获取图片数据
+            image = await media_store.get(img_url)
+
+            # 构造图片消息段
+            image_seg = MessageSegment.image(image)
 
-                # 构造图片消息段
-                image_seg = MessageSegment.image(resp.content)
+            # 发送图片
+            await get_bot().call_api("send_group_msg", **{
+                "group_id": group_id,
+                "message": image_seg
+            })
 
-                # 发送图片
-                await bot.call_api("send_group_msg", **{
-                    "group_id": group_id,
-                    "message": image_seg
-                })
+        async def _give_up(e: BaseException):
+            await get_bot().call_api("send_group_msg", **{
+                "group_id": group_id,
+                "message": f"意外错误|图片下载失败：{e} \n已达到最大重试次数"
+            })
 
-        except Exception as e:
-            logger.opt(exception=False).error(f"意外错误|图片发送失败: {str(e)}  第 {num} 次重试")
-            if num <= 3:
-                await self.send_onebot_image(img_url, group_id, num)
-            else:
-                await bot.call_api("send_group_msg", **{
-                    "group_id": group_id,
-                    "message": f"意外错误|图片下载失败：{e} \n已达到最大重试次数"
-                })
+        await retry_scheduler.run(f"群 {group_id} 图片 {img_url}", _send, on_give_up=_give_up)
 
     async def send_text(self, entry, if_need_trans):
         logger.debug(f"send text: {entry}")
\ No newline at end of file
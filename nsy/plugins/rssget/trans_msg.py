@@ -1,14 +1,12 @@
-from bs4 import BeautifulSoup
 from nonebot.log import logger
 
+from .html_extract import extract_html
+
 async def if_trans(entry):
     description = entry.get("description", "")
 
-    # 使用 BeautifulSoup 解析 HTML
-    soup = BeautifulSoup(description, "html.parser")
-
-    # 检测是否存在 class="rsshub-quote" 的 div
-    quote_div = soup.find("div", class_="rsshub-quote")
+    # 检测是否存在 class="rsshub-quote" 的 div（解析结果会被缓存，后续提取正文时复用）
+    quote_div = extract_html(description).is_quote
 
     # 判断结果
     if quote_div:
@@ -26,22 +24,3 @@ async def if_self_trans(username,entry):
         return True
     else:
         return False
-
-
-async def remove_html_tag_soup(html):
-    """
-    使用BeautifulSoup移除 div 标签及其内容
-
-    参数:
-        html (str): HTML字符串
-
-    返回:
-        str: 清理后的HTML字符串
-    """
-    soup = BeautifulSoup(html, 'html.parser')
-
-    # 找到所有目标标签并移除
-    for tag in soup.find_all('div', class_='rsshub-quote'):
-        tag.decompose()  # 彻底移除标签及其内容
-
-    return str(soup)
\ No newline at end of file
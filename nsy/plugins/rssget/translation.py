@@ -1,5 +1,8 @@
+import asyncio
 import json
 import re
+import time
+
 import httpx
 from openai import AsyncOpenAI
 from nonebot import get_plugin_config
@@ -10,6 +13,8 @@ from alibabacloud_tea_openapi import models as open_api_models
 from alibabacloud_tea_util import models as util_models
 
 from .config import Config
+from .network import NetworkManager
+from .translation_cache import cached_translation
 
 
 def get_config():
@@ -20,9 +25,30 @@ def get_config():
 class BaiDu:
     """
     调用百度机器翻译API进行翻译操作
+    Access Token 在各实例间共享，有效期结束前一段时间才重新获取
     """
+    # 提前刷新的秒数，避免请求途中过期
+    TOKEN_REFRESH_MARGIN = 300
+    # 百度返回的 Access Token 无效 / 过期错误码
+    TOKEN_ERROR_CODES = {110, 111}
+
+    _token: str | None = None
+    _token_expires_at = 0.0
+    _token_lock = asyncio.Lock()
+
+    @cached_translation("baidu", "texttrans")
     async def main(self, body=str):
-        access_token = await self.get_access_token()
+        result = await self._translate(body, await self.get_access_token())
+        if result.get("error_code") in self.TOKEN_ERROR_CODES:
+            # Token 提前失效（如密钥重置），重新获取后重试一次
+            result = await self._translate(body, await self.get_access_token(force=True))
+
+        # 提取单个 dst
+        first_translation = result["result"]["trans_result"][0]["dst"]
+
+        return first_translation
+
+    async def _translate(self, body: str, access_token: str) -> dict:
         url = "https://aip.baidubce.com/rpc/2.0/mt/texttrans/v1?access_token=" + access_token
 
         payload = json.dumps({
@@ -35,38 +61,62 @@ class BaiDu:
             'Accept': 'application/json'
         }
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.post(url, headers=headers, content=payload.encode("utf-8"))
-
-        result = response.json()
-
-        # 提取单个 dst
-        first_translation = result["result"]["trans_result"][0]["dst"]
-
-        return first_translation
+        client = NetworkManager.get_client("translate")
+        response = await client.post(url, headers=headers, content=payload.encode("utf-8"), timeout=30)
+        return response.json()
 
-
-    async def get_access_token(self):
+    async def get_access_token(self, force: bool = False):
         """
-        使用 AK，SK 生成鉴权签名（Access Token）
+        使用 AK，SK 生成鉴权签名（Access Token），未过期时直接返回缓存
         :return: access_token，或是None(如果错误)
         """
-        cfg = get_config()
-        url = "https://aip.baidubce.com/oauth/2.0/token"
-        params = {"grant_type": "client_credentials", "client_id": cfg.api_key, "client_secret": cfg.secret_key}
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.post(url, params=params)
-        return str(response.json().get("access_token"))
+        cls = type(self)
+        if not force and cls._token and time.monotonic() < cls._token_expires_at:
+            return cls._token
+        async with cls._token_lock:
+            # 等锁期间可能已由其它协程刷新
+            if not force and cls._token and time.monotonic() < cls._token_expires_at:
+                return cls._token
+            cfg = get_config()
+            url = "https://aip.baidubce.com/oauth/2.0/token"
+            params = {"grant_type": "client_credentials", "client_id": cfg.api_key, "client_secret": cfg.secret_key}
+            client = NetworkManager.get_client("translate")
+            response = await client.post(url, params=params, timeout=30)
+            result = response.json()
+            token = result.get("access_token")
+            if not token:
+                cls._token = None
+                return str(token)
+            expires_in = float(result.get("expires_in", 0))
+            cls._token = str(token)
+            cls._token_expires_at = time.monotonic() + max(0.0, expires_in - cls.TOKEN_REFRESH_MARGIN)
+            return cls._token
 
 
 
 class Ali:
     """
     调用阿里翻译
+    OpenAPI 客户端与接口参数只创建一次，各实例共享
     """
+    _client: OpenApiClient | None = None
+    _api_info: open_api_models.Params | None = None
+
     def __init__(self):
         pass
 
+    @classmethod
+    def get_client(cls) -> OpenApiClient:
+        if cls._client is None:
+            cls._client = cls.create_client()
+        return cls._client
+
+    @classmethod
+    def get_api_info(cls) -> open_api_models.Params:
+        if cls._api_info is None:
+            cls._api_info = cls.create_api_info()
+        return cls._api_info
+
     @staticmethod
     def create_client() -> OpenApiClient:
         """
@@ -112,8 +162,8 @@ class Ali:
         )
         return params
 
-    @staticmethod
-    async def main(text: str):
+    @cached_translation("ali", "TranslateGeneral")
+    async def main(self, text: str):
         """
         异步调用
         """
@@ -124,8 +174,8 @@ class Ali:
         """
         异步调用
         """
-        client = Ali.create_client()
-        params = Ali.create_api_info()
+        client = Ali.get_client()
+        params = Ali.get_api_info()
         # body params
         body = {}
         body['FormatType'] = 'text'
@@ -143,15 +193,35 @@ class Ali:
         return response['body']['Data']['Translated']
 
 
+DEEPSEEK_MODEL = "deepseek-v4-flash"
+
+
 class DeepSeek:
+    """
+    调用 DeepSeek 进行翻译
+    AsyncOpenAI 客户端只创建一次，复用翻译连接池中的 HTTP 客户端
+    """
+    _client: AsyncOpenAI | None = None
+    _http_client: httpx.AsyncClient | None = None
+
+    @classmethod
+    def get_client(cls) -> AsyncOpenAI:
+        http_client = NetworkManager.get_client("translate")
+        # 连接池被关闭重建后需跟随更换
+        if cls._client is None or cls._http_client is not http_client:
+            cls._client = AsyncOpenAI(
+                api_key=get_config().api_key,
+                base_url="https://api.deepseek.com",
+                http_client=http_client,
+            )
+            cls._http_client = http_client
+        return cls._client
+
+    @cached_translation("deepseek", DEEPSEEK_MODEL)
     async def main(self, text):
-        cfg = get_config()
-        client = AsyncOpenAI(
-            api_key=cfg.api_key,
-            base_url="https://api.deepseek.com"
-        )
+        client = self.get_client()
         response = await client.chat.completions.create(
-            model="deepseek-v4-flash",
+            model=DEEPSEEK_MODEL,
             messages=[
                 {
                     "role": "system",
@@ -180,6 +250,7 @@ class Ollama:
         pattern = r'<think>.*?</think>'
         return re.sub(pattern, '', text, flags=re.DOTALL)
 
+    @cached_translation("ollama", lambda: get_config().model_name)
     async def main(self, text, source_lang="日文", target_lang="中文"):
         """
         使用 Ollama 进行翻译
@@ -205,9 +276,9 @@ class Ollama:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=120) as client:
-                response = await client.post(url, json=payload)
-                response.raise_for_status()
+            client = NetworkManager.get_client("translate")
+            response = await client.post(url, json=payload)
+            response.raise_for_status()
             a = response.json()["response"].strip()
             return await self.remove_think_tags(a)
         except Exception as e:
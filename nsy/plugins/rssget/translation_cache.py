@@ -0,0 +1,115 @@
+import functools
+import hashlib
+import inspect
+import re
+import unicodedata
+from collections.abc import Callable
+from datetime import datetime
+
+from nonebot import get_plugin_config
+from nonebot.log import logger
+from nonebot_plugin_orm import get_session
+from sqlalchemy.exc import SQLAlchemyError
+
+from .config import Config
+from .feed_cache import SingleFlight
+from .models_method import TranslationCacheManager
+
+# 翻译失败时部分平台返回的占位文本，不写入缓存
+_FAILED_RESULTS = {"翻译失败"}
+
+_flight = SingleFlight()
+_writes = 0
+hits = 0
+misses = 0
+
+
+def normalize_text(text: str) -> str:
+    """规范化原文：统一 Unicode 形式，去除行尾与首尾空白，合并连续空行"""
+    text = unicodedata.normalize("NFC", text)
+    lines = [line.rstrip() for line in text.strip().splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines))
+
+
+def cache_key(text: str, provider: str, model: str, source: str, target: str) -> str:
+    raw = "\x00".join((normalize_text(text), provider, model, source, target))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def _lookup(key: str) -> str | None:
+    try:
+        async with get_session() as db_session:
+            return await TranslationCacheManager.get(db_session, key, datetime.now())
+    except SQLAlchemyError as e:
+        logger.warning(f"读取翻译缓存失败: {e}")
+        return None
+
+
+async def _store(key: str, provider: str, model: str, target: str, trans_text: str):
+    global _writes
+    cfg = get_plugin_config(Config)
+    try:
+        async with get_session() as db_session:
+            await TranslationCacheManager.put(
+                db_session,
+                id=key,
+                provider=provider,
+                model=model,
+                target=target,
+                trans_text=trans_text,
+                last_used=datetime.now(),
+            )
+            _writes += 1
+            # 每写入一定数量检查一次容量，避免每次写入都统计全表
+            if _writes % 50 == 0:
+                removed = await TranslationCacheManager.evict(db_session, cfg.translation_cache_max_entries)
+                if removed:
+                    logger.info(f"翻译缓存淘汰 {removed} 条记录")
+    except SQLAlchemyError as e:
+        logger.warning(f"写入翻译缓存失败: {e}")
+
+
+def cached_translation(provider: str, model: str | Callable[[], str], source: str = "auto", target: str = "zh"):
+    """
+    翻译结果缓存装饰器，用于各翻译平台的 main(self, text, ...) 方法
+    以 (规范化原文哈希, 平台, 模型, 源语言, 目标语言) 为键持久化到数据库，跨用户、群组与重启共享；
+    同一原文的并发翻译只请求一次
+    Args:
+        provider: 翻译平台名称
+        model: 模型名称，或在调用时读取配置的函数
+        source: 源语言，方法带 source_lang 参数时以调用参数为准
+        target: 目标语言，方法带 target_lang 参数时以调用参数为准
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(self, text, *args, **kwargs):
+            global hits, misses
+            if not get_plugin_config(Config).translation_cache or not text or not text.strip():
+                return await func(self, text, *args, **kwargs)
+            model_name = model() if callable(model) else model
+            # 位置参数与关键字参数统一按方法签名解析（含默认值）
+            bound = signature.bind(self, text, *args, **kwargs)
+            bound.apply_defaults()
+            source_lang = bound.arguments.get("source_lang", source)
+            target_lang = bound.arguments.get("target_lang", target)
+            key = cache_key(text, provider, model_name, source_lang, target_lang)
+
+            cached = await _lookup(key)
+            if cached is not None:
+                hits += 1
+                return cached
+
+            async def _translate():
+                result = await func(self, text, *args, **kwargs)
+                if result and result not in _FAILED_RESULTS:
+                    await _store(key, provider, model_name, target_lang, result)
+                return result
+
+            misses += 1
+            return await _flight.do(key, _translate)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,71 @@
+"""
+CPU 密集任务执行池
+
+默认使用进程池，避免订阅源解析等同步计算阻塞事件循环；进程池不可用时回退为线程池。
+本模块不依赖插件其它模块，可被基准脚本直接导入。
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from nonebot.log import logger
+
+
+class WorkerPool:
+    """
+    懒加载的执行池
+    进程池使用 fork 方式创建子进程：插件包在导入时依赖 NoneBot 运行环境，
+    spawn / forkserver 方式下子进程无法重新导入任务函数，因此不支持 fork 的平台直接使用线程池
+    """
+
+    def __init__(self, kind: str = "process", workers: int = 2, name: str = "worker"):
+        """
+        Args:
+            kind: "process" 进程池，"thread" 线程池
+            workers: 工作进程/线程数
+            name: 日志中显示的名称
+        """
+        self.kind = kind
+        self.workers = workers
+        self.name = name
+        self._executor: Executor | None = None
+
+    def _create(self) -> Executor:
+        if self.kind == "process":
+            try:
+                context = multiprocessing.get_context("fork")
+                executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+                logger.info(f"{self.name} 使用进程池，进程数 {self.workers}")
+                return executor
+            except (ValueError, OSError) as e:
+                logger.warning(f"{self.name} 无法创建进程池，改用线程池: {e}")
+                self.kind = "thread"
+        logger.info(f"{self.name} 使用线程池，线程数 {self.workers}")
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._create()
+        return self._executor
+
+    async def start(self):
+        """预先创建工作进程，避免首次解析时的启动延迟"""
+        await self.run(int, 0)
+
+    async def run(self, func, *args):
+        """在执行池中运行 func(*args)，func 与参数需可序列化"""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.executor, func, *args)
+        except BrokenProcessPool:
+            # 子进程异常退出（如被 OOM 杀死）后进程池不可再用，重建后重试一次
+            logger.warning(f"{self.name} 进程池已损坏，正在重建")
+            self.shutdown()
+            return await loop.run_in_executor(self.executor, func, *args)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None